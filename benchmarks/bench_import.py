@@ -0,0 +1,42 @@
+"""
+Import time of `src.main` and every `src.*` module, each measured in a fresh
+interpreter with ``-X importtime`` (median of the runs).
+
+    python -m benchmarks.bench_import [runs]
+"""
+import pkgutil
+import statistics
+import subprocess
+import sys
+
+import src
+
+
+def import_time(module: str) -> float:
+    """Returns the cumulative import time of the module in milliseconds"""
+
+    output = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    for line in reversed(output.splitlines()):
+        _, cumulative, name = line.split("|")
+        if name.strip() == module:
+            return int(cumulative) / 1000
+    raise ValueError(f"{module} import time is not reported")
+
+
+def main(runs: int = 5) -> None:
+    modules = sorted(
+        f"src.{module.name}" for module in pkgutil.iter_modules(src.__path__)
+    )
+    print(f"{'module':>16} {'import time':>12}")
+    for module in modules:
+        median = statistics.median(import_time(module) for _ in range(runs))
+        print(f"{module:>16} {median:>9.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,62 @@
+"""
+Memory footprint of the regular models and their slotted compact variants.
+
+    python -m benchmarks.bench_memory [objects]
+"""
+import sys
+import tracemalloc
+
+from src.compact import CompactOrder, CompactOrderItem, CompactProduct
+from src.customer import Customer, CustomerAddress
+from src.employee import Employee, EmployeeDepartment
+from src.helpers import deferred_registration
+from src.mail import StubTransport, mail_outbox
+from src.order import Order, OrderItem
+from src.product import Product
+from src.user import User
+
+
+def bytes_per_object(factory, count: int) -> float:
+    tracemalloc.start()
+    started = tracemalloc.get_traced_memory()[0]
+    objects = [factory(i) for i in range(count)]
+    used = tracemalloc.get_traced_memory()[0] - started
+    tracemalloc.stop()
+    del objects
+    return used / count
+
+
+def main(count: int = 100_000) -> None:
+    mail_outbox.set_transport(StubTransport())
+    with deferred_registration():
+        user = User("Gvido", "Van Rosom", "+374747474", "van.rosom@python.org")
+        address = CustomerAddress("Armenia, Yerevan")
+        customer = Customer(user=user, addresses=[address])
+        employee = Employee(user, EmployeeDepartment("Delivery"), 1000, 0, 0)
+        product = Product("Benchmark product", 100, 0, count * 10)
+
+        cases = {
+            "Product": (
+                lambda i: Product(f"Product {i}", 100, 0, 10),
+                lambda i: CompactProduct(f"Product {i}", 100, 0, 10),
+            ),
+            "OrderItem": (
+                lambda i: OrderItem(product, 1, 100),
+                lambda i: CompactOrderItem(product, 1, 100),
+            ),
+            "Order": (
+                lambda i: Order(customer, address, employee),
+                lambda i: CompactOrder(customer, address, employee),
+            ),
+        }
+
+        print(f"{'model':>10} {'regular':>12} {'compact':>12} {'saved':>8}")
+        for name, (regular, compact) in cases.items():
+            before = bytes_per_object(regular, count)
+            after = bytes_per_object(compact, count)
+            saved = 1 - after / before
+            print(f"{name:>10} {before:>10.0f} B {after:>10.0f} B {saved:>7.0%}")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
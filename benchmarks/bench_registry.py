@@ -0,0 +1,54 @@
+"""
+Insert throughput of the concurrent `InstanceManagement` by thread count.
+
+    python -m benchmarks.bench_registry [total_inserts]
+"""
+import sys
+import threading
+import time
+from dataclasses import dataclass
+
+from src.management import InstanceManagement
+
+
+@dataclass
+class Record:
+    id: str
+    sku: str
+
+
+def insert_throughput(threads: int, total: int, stripes: int) -> float:
+    """Returns inserts per second of `threads` threads sharing `total` inserts"""
+
+    management = InstanceManagement(
+        [], unique_indexes=("sku",), concurrent=True, stripes=stripes
+    )
+    per_thread = total // threads
+    barrier = threading.Barrier(threads + 1)
+
+    def insert(thread_id: int) -> None:
+        barrier.wait()
+        for i in range(per_thread):
+            key = f"{thread_id}-{i}"
+            management.set_instance(Record(id=key, sku=key))
+
+    workers = [threading.Thread(target=insert, args=(i,)) for i in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    return per_thread * threads / (time.perf_counter() - started)
+
+
+def main(total: int = 200_000) -> None:
+    print(f"{'threads':>8} {'striped (16)':>16} {'single lock':>16}")
+    for threads in (1, 2, 4, 8):
+        striped = insert_throughput(threads, total, stripes=16)
+        single = insert_throughput(threads, total, stripes=1)
+        print(f"{threads:>8} {striped:>14,.0f}/s {single:>14,.0f}/s")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
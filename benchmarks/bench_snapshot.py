@@ -0,0 +1,71 @@
+"""
+Snapshot save and restore throughput.
+
+    python -m benchmarks.bench_snapshot [orders]
+"""
+import os
+import sys
+import tempfile
+import time
+
+from src.customer import Customer, CustomerAddress
+from src.employee import Employee, EmployeeDepartment
+from src.mail import StubTransport, mail_outbox
+from src.order import Order, OrderItem, order_instances
+from src.product import Product
+from src.snapshot import load_snapshot, save_snapshot
+from src.user import User
+
+
+def populate(orders: int) -> None:
+    mail_outbox.set_transport(StubTransport())
+    employee = Employee(
+        user=User("Gvido", "Van Rosom", "+374747474", "gvido@staff.org"),
+        department=EmployeeDepartment("Delivery"),
+        salary=1000,
+        num_absent=0,
+        absense_cost=0,
+    )
+    products = [
+        Product(f"Product {i}", price=100 + i, discount=0, stock_qty=orders * 10)
+        for i in range(100)
+    ]
+    customers = []
+    for i in range(max(orders // 10, 1)):
+        address = CustomerAddress(f"Armenia, Yerevan {i}")
+        user = User("Gvido", "Van Rosom", "+374747474", f"gvido@customer-{i}.org")
+        customers.append(Customer(user=user, addresses=[address]))
+
+    for i in range(orders):
+        customer = customers[i % len(customers)]
+        order = Order(customer, customer.addresses[0], employee)
+        for product in products[i % 97 : i % 97 + 3]:
+            order.items.add(OrderItem(product, 1, product.final_price))
+    mail_outbox.flush()
+
+
+def main(orders: int = 50_000) -> None:
+    populate(orders)
+    handle, path = tempfile.mkstemp(suffix=".snapshot")
+    os.close(handle)
+    try:
+        started = time.perf_counter()
+        save_snapshot(path)
+        saved = time.perf_counter() - started
+        size = os.path.getsize(path) / 2**20
+
+        order_instances.set_empty_instances()
+        started = time.perf_counter()
+        restored = load_snapshot(path)
+        loaded = time.perf_counter() - started
+    finally:
+        os.remove(path)
+
+    objects = sum(restored.values())
+    print(f"snapshot: {size:.1f} MiB, {objects:,} registered objects")
+    print(f"save:    {saved:.2f}s ({size / saved:.1f} MiB/s)")
+    print(f"restore: {loaded:.2f}s ({objects / loaded:,.0f} objects/s)")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,66 @@
+"""
+Order status transition checks per second: the legacy `if` chains against the
+precomputed transition table of `src.transitions`.
+
+    python -m benchmarks.bench_transitions [checks]
+"""
+import sys
+import time
+from itertools import cycle, islice, product
+
+from src.constants import OrderDeliveryStatuses, OrderPaymentStatus
+from src.exceptions import OrderAlreadyHasBeenPaid, StatusDoesNotExists
+from src.transitions import delivery_state_machine, payment_state_machine
+
+
+def legacy_delivery_check(ordered: bool, source: int, status: int) -> None:
+    if status not in OrderDeliveryStatuses.values():
+        raise StatusDoesNotExists
+    if ordered and status not in [
+        OrderDeliveryStatuses.CANCELED.value,
+        OrderDeliveryStatuses.DELIVERED.value,
+        OrderDeliveryStatuses.RETURNED.value,
+    ]:
+        raise OrderAlreadyHasBeenPaid
+
+
+def legacy_payment_check(ordered: bool, source: int, status: int) -> None:
+    if status not in OrderPaymentStatus.values():
+        raise StatusDoesNotExists
+    if ordered and status not in [
+        OrderPaymentStatus.CANCELED.value,
+        OrderPaymentStatus.REFUNDED.value,
+    ]:
+        raise OrderAlreadyHasBeenPaid
+
+
+def checks_per_second(check, statuses, total: int) -> float:
+    values = [status.value for status in statuses]
+    cases = list(islice(cycle(product((False, True), values, values)), total))
+    started = time.perf_counter()
+    for ordered, source, status in cases:
+        try:
+            check(ordered, source, status)
+        except OrderAlreadyHasBeenPaid:
+            pass
+    return total / (time.perf_counter() - started)
+
+
+def main(total: int = 1_000_000) -> None:
+    print(f"{'status':>10} {'legacy if chain':>18} {'transition table':>18}")
+    for name, statuses, legacy, machine in (
+        (
+            "delivery",
+            OrderDeliveryStatuses,
+            legacy_delivery_check,
+            delivery_state_machine,
+        ),
+        ("payment", OrderPaymentStatus, legacy_payment_check, payment_state_machine),
+    ):
+        before = checks_per_second(legacy, statuses, total)
+        after = checks_per_second(machine.resolve, statuses, total)
+        print(f"{name:>10} {before:>16,.0f}/s {after:>16,.0f}/s")
+
+
+if __name__ == "__main__":
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,211 @@
+"""
+Benchmark suite of the models, registry lookups, orders and the email path.
+
+Results are printed and written as JSON, so they can be compared across
+commits. Emails are delivered to an in-memory stub transport.
+
+    python -m benchmarks.suite [--scale 1000 100000 1000000] [--output results.json]
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import time
+from typing import Callable, Optional
+
+from src.customer import Customer, CustomerAddress
+from src.employee import Employee, EmployeeDepartment
+from src.helpers import deferred_registration
+from src.mail import StubTransport, mail_outbox
+from src.management import registries
+from src.order import Order, OrderItem
+from src.product import Product
+from src.user import User
+
+LOOKUPS = 1_000  # lookups per latency measurement
+
+
+def reset_registries() -> None:
+    for registry in registries.values():
+        registry.set_empty_instances()
+
+
+def user(i: int, prefix: str = "user") -> User:
+    return User("Gvido", "Van Rosom", "+374747474", f"{prefix}@{prefix}-{i}.org")
+
+
+def throughput(name: str, scale: int, create: Callable[[int], object]) -> dict:
+    """Measures creations per second of `scale` registered instances"""
+
+    reset_registries()
+    started = time.perf_counter()
+    for i in range(scale):
+        create(i)
+    seconds = time.perf_counter() - started
+    return {
+        "name": name,
+        "scale": scale,
+        "seconds": seconds,
+        "ops_per_second": scale / seconds,
+    }
+
+
+def latency(name: str, scale: int, call: Callable[[int], object]) -> dict:
+    """Measures median and p99 latency of `LOOKUPS` calls"""
+
+    timings = []
+    for i in range(LOOKUPS):
+        started = time.perf_counter()
+        call(i)
+        timings.append(time.perf_counter() - started)
+    timings.sort()
+    return {
+        "name": name,
+        "scale": scale,
+        "median_seconds": statistics.median(timings),
+        "p99_seconds": timings[int(len(timings) * 0.99) - 1],
+    }
+
+
+def creation_benchmarks(scale: int) -> list[dict]:
+    department = None
+
+    def employee(i: int) -> Employee:
+        nonlocal department
+        if department is None:
+            department = EmployeeDepartment("Benchmark delivery")
+        return Employee(user(i, "staff"), department, 1000, 0, 0)
+
+    return [
+        throughput("create_user", scale, user),
+        throughput(
+            "create_product",
+            scale,
+            lambda i: Product(f"Product {i}", price=100, discount=0, stock_qty=10),
+        ),
+        throughput(
+            "create_customer",
+            scale,
+            lambda i: Customer(user(i), addresses=[CustomerAddress("Yerevan")]),
+        ),
+        throughput("create_employee", scale, employee),
+    ]
+
+
+def order_benchmarks(scale: int) -> list[dict]:
+    reset_registries()
+    customers = []
+    for i in range(max(scale // 100, 1)):
+        customers.append(Customer(user(i), addresses=[CustomerAddress("Yerevan")]))
+    department = EmployeeDepartment("Benchmark delivery")
+    employees = [
+        Employee(user(i, "staff"), department, 1000, 0, 0)
+        for i in range(max(scale // 1_000, 1))
+    ]
+
+    def order(i: int) -> Order:
+        customer = customers[i % len(customers)]
+        return Order(
+            customer,
+            customer_address=customer.addresses[0],
+            employee=employees[i % len(employees)],
+        )
+
+    started = time.perf_counter()
+    for i in range(scale):
+        order(i)
+    seconds = time.perf_counter() - started
+    results = [
+        {
+            "name": "create_order",
+            "scale": scale,
+            "seconds": seconds,
+            "ops_per_second": scale / seconds,
+        },
+        latency(
+            "get_customer_orders",
+            scale,
+            lambda i: Order.get_customer_orders(customers[i % len(customers)].id),
+        ),
+        latency(
+            "get_employee_orders",
+            scale,
+            lambda i: Order.get_employee_orders(employees[i % len(employees)].id),
+        ),
+    ]
+
+    product = Product("Benchmark product", price=100, discount=0, stock_qty=scale)
+    with deferred_registration():
+        items = [OrderItem(product, 1, 100) for _ in range(scale)]
+    large_order = order(0)
+    large_order.add_items(items)
+    results.append(latency("order_total", scale, lambda i: large_order.order_total()))
+    return results
+
+
+def email_benchmarks(scale: int) -> list[dict]:
+    reset_registries()
+    customers = [
+        Customer(user(i), addresses=[CustomerAddress("Yerevan")])
+        for i in range(min(scale, LOOKUPS))
+    ]
+    mail_outbox.flush(timeout=60)
+
+    started = time.perf_counter()
+    for i in range(scale):
+        customers[i % len(customers)].request_verification_code()
+    issued = time.perf_counter() - started
+    mail_outbox.flush(timeout=600)
+    delivered = time.perf_counter() - started
+    return [
+        {
+            "name": "issue_verification_code",
+            "scale": scale,
+            "seconds": issued,
+            "ops_per_second": scale / issued,
+            "delivered_seconds": delivered,
+        }
+    ]
+
+
+def commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scales: list[int]) -> dict:
+    mail_outbox.flush(timeout=60)
+    mail_outbox.set_transport(StubTransport())
+    results = []
+    for scale in scales:
+        for benchmark in (creation_benchmarks, order_benchmarks, email_benchmarks):
+            for result in benchmark(scale):
+                print(json.dumps(result))
+                results.append(result)
+    reset_registries()
+    return {
+        "commit": commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, nargs="+", default=[1_000, 100_000])
+    parser.add_argument("--output", default="benchmark-results.json")
+    arguments = parser.parse_args()
+
+    report = run(arguments.scale)
+    with open(arguments.output, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
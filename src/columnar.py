@@ -0,0 +1,150 @@
+"""
+Columnar store of order items for reporting over millions of items.
+
+The store is a read-only snapshot for reports: it copies the items when the
+orders are added and does not follow later changes of the orders (added or
+removed items, changed quantities or prices). Build a new store from the
+orders for a fresh report.
+
+Requires NumPy, which is an optional dependency of the project. It is
+imported lazily, so importing the module doesn't need it.
+"""
+from typing import Iterable, Optional
+
+
+class OrderItemColumns:
+    """
+    Keeps order items as NumPy columns (qty, item price, product index and
+    order index) so the totals are computed in vectorised passes instead of
+    summing `OrderItem.item_total` one by one. The items are grouped by
+    order in a lazily built index, so the total of a single order only reads
+    the items of that order.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        try:
+            import numpy as np
+        except ImportError as e:
+            raise ImportError(
+                "NumPy is required for the columnar order item store, "
+                "install it with `pip install numpy`"
+            ) from e
+
+        capacity = max(capacity, 1)
+        self.size = 0
+        self.qty = np.empty(capacity, dtype=np.float64)
+        self.item_price = np.empty(capacity, dtype=np.float64)
+        self.product_index = np.empty(capacity, dtype=np.int64)
+        self.order_index = np.empty(capacity, dtype=np.int64)
+        self.order_customer_index = np.empty(capacity, dtype=np.int64)
+
+        self.orders: list[str] = []
+        self.products: list[str] = []
+        self.customers: list[str] = []
+        self._orders: dict[str, int] = {}
+        self._products: dict[str, int] = {}
+        self._customers: dict[str, int] = {}
+        # item positions sorted by order and the item range of every order
+        self._order_ranges: Optional[tuple] = None
+
+    @classmethod
+    def from_orders(cls, orders: Iterable) -> "OrderItemColumns":
+        columns = cls()
+        for order in orders:
+            columns.add_order(order)
+        return columns
+
+    def add_order(self, order) -> None:
+        """Adds the order with all its items"""
+
+        self._order_position(order)
+        for item in order.items:
+            self.add_item(order, item)
+
+    def add_item(self, order, item) -> None:
+        if self.size == len(self.qty):
+            self._grow(self.size + 1)
+
+        position = self.size
+        self.qty[position] = item.qty
+        self.item_price[position] = item.item_price
+        self.product_index[position] = self._position(
+            self._products, self.products, item.product.id
+        )
+        self.order_index[position] = self._order_position(order)
+        self.size += 1
+        self._order_ranges = None
+
+    def order_total(self, order_id: str) -> float:
+        """Returns sum of the order items total amount"""
+        import numpy as np
+
+        position = self._orders.get(order_id)
+        if position is None:
+            return 0.0
+        ordering, bounds = self._ranges()
+        items = ordering[bounds[position] : bounds[position + 1]]
+        return float(np.dot(self.qty[items], self.item_price[items]))
+
+    def totals_by_order(self) -> dict[str, float]:
+        return self._grouped_totals(self.order_index[: self.size], self.orders)
+
+    def totals_by_product(self) -> dict[str, float]:
+        return self._grouped_totals(self.product_index[: self.size], self.products)
+
+    def totals_by_customer(self) -> dict[str, float]:
+        customer_index = self.order_customer_index[self.order_index[: self.size]]
+        return self._grouped_totals(customer_index, self.customers)
+
+    def _ranges(self) -> tuple:
+        import numpy as np
+
+        if self._order_ranges is None:
+            order_index = self.order_index[: self.size]
+            ordering = np.argsort(order_index, kind="stable")
+            bounds = np.searchsorted(
+                order_index[ordering], np.arange(len(self.orders) + 1)
+            )
+            self._order_ranges = ordering, bounds
+        return self._order_ranges
+
+    def _grouped_totals(self, groups, keys: list[str]) -> dict[str, float]:
+        import numpy as np
+
+        item_totals = self.qty[: self.size] * self.item_price[: self.size]
+        totals = np.bincount(groups, weights=item_totals, minlength=len(keys))
+        return dict(zip(keys, totals.tolist()))
+
+    def _order_position(self, order) -> int:
+        position = self._orders.get(order.id)
+        if position is None:
+            position = self._position(self._orders, self.orders, order.id)
+            if position == len(self.order_customer_index):
+                import numpy as np
+
+                self.order_customer_index = np.resize(
+                    self.order_customer_index, max(2 * position, position + 1)
+                )
+            self.order_customer_index[position] = self._position(
+                self._customers, self.customers, order.customer.id
+            )
+            self._order_ranges = None
+        return position
+
+    @staticmethod
+    def _position(positions: dict[str, int], keys: list[str], key: str) -> int:
+        position = positions.get(key)
+        if position is None:
+            position = positions[key] = len(keys)
+            keys.append(key)
+        return position
+
+    def _grow(self, needed: int) -> None:
+        """Resizes the columns to fit at least `needed` items, doubling them"""
+        import numpy as np
+
+        capacity = max(2 * len(self.qty), needed)
+        self.qty = np.resize(self.qty, capacity)
+        self.item_price = np.resize(self.item_price, capacity)
+        self.product_index = np.resize(self.product_index, capacity)
+        self.order_index = np.resize(self.order_index, capacity)
@@ -0,0 +1,52 @@
+"""
+Slotted variants of the models for holding millions of objects in memory.
+
+The variants share the behaviour (the model mixins) and the management
+instances of the original models, but store no per-instance `__dict__` and
+keep the id as a 128-bit integer (see `CompactBaseModel`).
+"""
+from dataclasses import dataclass, field
+from typing import Optional
+
+from src.constants import OrderDeliveryStatuses, OrderPaymentStatus
+from src.customer import Customer, CustomerAddress
+from src.employee import Employee, EmployeeRating
+from src.helpers import CompactBaseModel
+from src.order import OrderItemMap, OrderItemMixin, OrderMixin, order_instances
+from src.product import Product, ProductMixin, product_instances
+
+
+@dataclass(slots=True)
+class CompactProduct(ProductMixin, CompactBaseModel):
+    product_name: str
+    price: float
+    discount: float  # by percents
+    stock_qty: float
+    _sku: str = ""
+    _final_price: Optional[float] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    __management_instance = product_instances
+
+
+@dataclass(slots=True)
+class CompactOrderItem(OrderItemMixin, CompactBaseModel):
+    product: Product
+    qty: float
+    item_price: float
+    _order_items: Optional[OrderItemMap] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+
+@dataclass(slots=True)
+class CompactOrder(OrderMixin, CompactBaseModel):
+    customer: Customer
+    customer_address: CustomerAddress
+    employee: Employee
+    employee_rating: Optional[EmployeeRating] = None
+    items: OrderItemMap = field(default_factory=OrderItemMap)
+    _order_delivery_status: int = OrderDeliveryStatuses.WAITING.value
+    _order_payment_status: int = OrderPaymentStatus.WAITING.value
+    _ordered: bool = False
+    __management_instance = order_instances
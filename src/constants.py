@@ -1,8 +1,10 @@
 import os
 from enum import Enum, auto
+from functools import cache
 
 
 MINIMUM_RATING = 2
+MAX_STORED_RATINGS = 1_000  # raw ratings kept per employee
 
 
 class CustomerAddressActions(Enum):
@@ -23,6 +25,11 @@ class OrderDeliveryStatuses(Enum):
     def values(cls):
         return [i.value for i in cls]
 
+    @classmethod
+    @cache
+    def value_set(cls) -> frozenset:
+        return frozenset(i.value for i in cls)
+
 
 class OrderPaymentStatus(Enum):
     WAITING = auto()
@@ -35,6 +42,11 @@ class OrderPaymentStatus(Enum):
     def values(cls):
         return [i.value for i in cls]
 
+    @classmethod
+    @cache
+    def value_set(cls) -> frozenset:
+        return frozenset(i.value for i in cls)
+
 
 # Email settings
 
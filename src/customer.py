@@ -1,18 +1,21 @@
-import asyncio
 import logging
 import random
+from concurrent.futures import Future
 from dataclasses import dataclass, field
-from typing import Optional, Callable
+from typing import Iterable, Optional, Callable, Union
 
 from src.constants import CustomerAddressActions
 from src.exceptions import NotPassedVerification
-from src.helpers import send_email_data, BaseModel
+from src.helpers import BaseModel, OrderedIdMap, timed_construction
+from src.mail import mail_outbox
 from src.user import User
 from src.management import InstanceManagement
 
-logger = logging.getLogger()
-customer_instances = InstanceManagement([])
-customer_address_instances = InstanceManagement([])
+logger = logging.getLogger(__name__)
+customer_instances = InstanceManagement(
+    [], unique_indexes=("user.id",), concurrent=True, name="customers"
+)
+customer_address_instances = InstanceManagement([], name="customer_addresses")
 
 
 @dataclass
@@ -26,75 +29,119 @@ class Customer(BaseModel):
     """Describes customer object"""
 
     user: User
-    addresses: list[CustomerAddress] = field(default_factory=list)
+    addresses: OrderedIdMap = field(default_factory=OrderedIdMap)  # by address id
     is_verified: bool = False
     verification_code: Optional[str] = None
     __management_instance = customer_instances
 
-    def handle_address(self, action, data) -> list:
-        """Sets new address and returns the user address list."""
+    def handle_address(self, action, data) -> OrderedIdMap:
+        """
+        Adds / removes the address (or a list of addresses) and returns the
+        user addresses.
+        """
         action_method = self._manage_addresses(action)
-        action_method(data)
+        action_method(data if isinstance(data, (list, tuple, set)) else [data])
         return self.addresses
 
     def verify(self, code) -> bool:
         """Verifies the customer profile."""
-        logger.info("Please make sure the given code is correct")
+        logger.info(
+            "Please make sure the given code is correct",
+            extra={"customer_id": self.id},
+        )
         if any([not self.verification_code, self.verification_code != code]):
             raise NotPassedVerification
 
         self.verification_code = None
         self.is_verified = True
+        customer_instances.persist(self)
         return True
 
     def request_verification_code(self) -> None:
         """Reset a new verification code for a user."""
-        logger.info("Verification code has been generated")
+        logger.info(
+            "Verification code has been generated", extra={"customer_id": self.id}
+        )
         self._handle_verification_code()
-
-    def add_address(self, address: str) -> None:
+        customer_instances.persist(self)
+
+    async def arequest_verification_code(self) -> None:
+        """
+        Resets a new verification code and waits for its email delivery
+        without blocking the running event loop.
+        """
+        import asyncio
+
+        logger.info(
+            "Verification code has been generated", extra={"customer_id": self.id}
+        )
+        delivery = self._handle_verification_code()
+        customer_instances.persist(self)
+        await asyncio.wrap_future(delivery)
+
+    @classmethod
+    async def acreate(cls, *args, **kwargs) -> "Customer":
+        """
+        Creates a customer inside a running event loop. The customer is
+        validated and registered in a worker thread, so the loop is not
+        blocked. The verification code is emailed in the background.
+        """
+        import asyncio
+
+        return await asyncio.to_thread(cls, *args, **kwargs)
+
+    def add_address(self, address: Union[str, CustomerAddress]) -> None:
         """Appends a new address into addresses list."""
-        self.addresses.append(CustomerAddress(address))
+        self.add_addresses([address])
+
+    def add_addresses(self, addresses: Iterable[Union[str, CustomerAddress]]) -> None:
+        """Appends the new addresses into addresses list."""
+        for address in addresses:
+            if not isinstance(address, CustomerAddress):
+                address = CustomerAddress(address)
+            self.addresses.add(address)
+        customer_instances.persist(self)
 
     def remove_address(self, address_id: str) -> None:
         """Removes an address with given address_id"""
+        self.remove_addresses([address_id])
 
-        self.addresses = list(filter(lambda x: x.id != address_id, self.addresses))
+    def remove_addresses(self, address_ids: Iterable[str]) -> None:
+        """Removes the addresses with given ids"""
+        for address_id in address_ids:
+            self.addresses.remove(address_id)
+        customer_instances.persist(self)
 
     def is_address_valid(self, address: CustomerAddress) -> bool:
         return address in self.addresses
 
-    def _manage_addresses(self, value) -> Callable[[str], None]:
+    def _manage_addresses(self, value) -> Callable[[list], None]:
         """Resolves and returns the responsible method to deal with addresses"""
 
         actions_facade = {
-            CustomerAddressActions.ADD.value: self.add_address,
-            CustomerAddressActions.REMOVE.value: self.remove_address
+            CustomerAddressActions.ADD.value: self.add_addresses,
+            CustomerAddressActions.REMOVE.value: self.remove_addresses
         }
 
         return actions_facade.get(value, None)
 
-    @staticmethod
-    async def __mail_sender(code: str, recipients: list):
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(None, send_email_data, code, recipients)
-
-    def _handle_verification_code(self) -> None:
-        """Generates and sends verification code to the user email."""
+    def _handle_verification_code(self) -> Future:
+        """Generates and queues verification code to the user email."""
 
         self.verification_code = f"{random.randrange(10_000, 99_000)}"
-        asyncio.run(self.__mail_sender(self.verification_code, [self.user.email]))
+        delivery = mail_outbox.enqueue(self.verification_code, [self.user.email])
         logger.info("Emailing is on the process")
+        return delivery
 
     def _validate_customer(self):
         """Validates customer by using the given user email address"""
-        user_id = self.user.id
-
-        _customer = len(list(filter(lambda x: x.user.id == user_id, customer_instances.get_instances()))) == 0
-        if not _customer:
+        if customer_instances.exists("user.id", self.user.id):
             raise ValueError
         return True
 
+    @timed_construction
     def __post_init__(self):
+        if not isinstance(self.addresses, OrderedIdMap):
+            self.addresses = OrderedIdMap(self.addresses)
         super().__post_init__()
         self._handle_verification_code()
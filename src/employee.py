@@ -1,17 +1,27 @@
 import logging
+from collections import deque
 from dataclasses import dataclass, field
+from datetime import datetime
 from typing import Optional
 
-from src.constants import MINIMUM_RATING
+from src.constants import MINIMUM_RATING, MAX_STORED_RATINGS
 from src.management import InstanceManagement
-from src.helpers import BaseModel
+from src.helpers import BaseModel, timed_construction
 from src.user import User
 from src.exceptions import FiredFromWorkException
 
-logger = logging.getLogger()
-employee_rating_instances = InstanceManagement([])
-employee_department_instances = InstanceManagement([])
-employee_instances = InstanceManagement([])
+logger = logging.getLogger(__name__)
+employee_rating_instances = InstanceManagement([], name="employee_ratings")
+employee_department_instances = InstanceManagement(
+    [], unique_indexes=("name",), concurrent=True, name="employee_departments"
+)
+employee_instances = InstanceManagement(
+    [],
+    unique_indexes=("user.email",),
+    indexes=("user.id", "department.name"),
+    concurrent=True,
+    name="employees",
+)
 
 
 @dataclass
@@ -20,6 +30,7 @@ class EmployeeRating(BaseModel):
 
     value: float
     message: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.now)
     __management_instance = employee_rating_instances
 
 
@@ -32,17 +43,7 @@ class EmployeeDepartment(BaseModel):
 
     def _validate_employeedepartment(self):
         """Validates and returns is there any employee department by the given name"""
-        if (
-            len(
-                list(
-                    filter(
-                        lambda department: department.name == self.name,
-                        self.__management_instance.get_instances(),
-                    )
-                )
-            )
-            > 0
-        ):
+        if self.__management_instance.exists("name", self.name):
             raise ValueError
 
 
@@ -57,7 +58,23 @@ class Employee(BaseModel):
     absense_cost: float
     __blocked_for_a_week: bool = False
     __management_instance = employee_instances
-    __rating: list[EmployeeRating] = field(default_factory=list)
+    __rating: deque[EmployeeRating] = field(
+        default_factory=lambda: deque(maxlen=MAX_STORED_RATINGS)
+    )
+    _rating_count: int = field(default=0, init=False, repr=False)
+    _rating_sum: float = field(default=0, init=False, repr=False)
+    _monthly_ratings: dict[tuple[int, int], list] = field(
+        default_factory=dict, init=False, repr=False
+    )
+
+    @timed_construction
+    def __post_init__(self):
+        ratings, self.__rating = self.__rating, deque(maxlen=MAX_STORED_RATINGS)
+        for rating in ratings:
+            self._add_rating(rating)
+        if self._rating_count:
+            self.block_user(self._block_unblock_employee_trigger(self._avg_rating()))
+        super().__post_init__()
 
     def block_user(self, trigger: bool) -> None:
         """Block / Unblock user"""
@@ -74,31 +91,61 @@ class Employee(BaseModel):
         """Returns average rating of an employee"""
         avg_rating = self._avg_rating()
 
-        block_user = self._block_unblock_employee_trigger(avg_rating)
-        self.block_user(block_user)
-
         if avg_rating < 2:
             logger.warning(
-                "Please pay attention on your work. your rating has to be greater than `2`"
+                "Please pay attention on your work. your rating has to be greater than `2`",
+                extra={"employee_id": self.id, "rating": avg_rating},
             )
 
         elif avg_rating > 4:
             logger.info(
-                "Congrats you have worked well in this month. Please make this progress continued ..."
+                "Congrats you have worked well in this month. Please make this progress continued ...",
+                extra={"employee_id": self.id, "rating": avg_rating},
             )
 
-        return self._avg_rating()
+        return avg_rating
 
     @rating.setter
     def rating(self, data: EmployeeRating) -> None:
-        """Sets new rating"""
+        """Sets new rating and re-evaluates the employee blocking"""
         if not data.value > 0:
             raise ValueError("Value must be grater or equal 0")
+        self._add_rating(data)
+
+        block_user = self._block_unblock_employee_trigger(self._avg_rating())
+        self.block_user(block_user)
+        employee_instances.persist(self)
+
+    @property
+    def ratings(self) -> list[EmployeeRating]:
+        """Returns the latest stored ratings (at most `MAX_STORED_RATINGS`)"""
+
+        return list(self.__rating)
+
+    def monthly_rating(self, year: int, month: int) -> Optional[float]:
+        """Returns average rating of the given month"""
+
+        aggregate = self._monthly_ratings.get((year, month))
+        if aggregate is None:
+            return None
+        count, total = aggregate
+        return total / count
+
+    def _add_rating(self, data: EmployeeRating) -> None:
+        """Stores the rating and updates the running aggregates"""
+
         self.__rating.append(data)
+        self._rating_count += 1
+        self._rating_sum += data.value
+
+        month = (data.created_at.year, data.created_at.month)
+        aggregate = self._monthly_ratings.setdefault(month, [0, 0])
+        aggregate[0] += 1
+        aggregate[1] += data.value
 
     def _avg_rating(self) -> float:
-        """Calculates avg of employee's rating"""
-        return sum(i.value for i in self.__rating) / len(self.__rating)
+        """Returns avg of employee's rating"""
+        return self._rating_sum / self._rating_count
 
     @staticmethod
     def _block_unblock_employee_trigger(rating: float) -> bool:
@@ -108,18 +155,7 @@ class Employee(BaseModel):
     def _validate_employee(self) -> None:
         """Validates and returns is there any employee created by the given user"""
 
-        user_email = self.user.email
-        if (
-            len(
-                list(
-                    filter(
-                        lambda employee: employee.user.email == user_email,
-                        employee_instances.get_instances(),
-                    )
-                )
-            )
-            > 0
-        ):
+        if employee_instances.exists("user.email", self.user.email):
             raise ValueError
 
     def _calculate_absense_sum(self) -> float:
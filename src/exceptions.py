@@ -36,3 +36,11 @@ class ItemsDoNotFound(Exception):
 
 class RateError(Exception):
     """Raises when rating is not allowed"""
+
+
+class EmailDeliveryError(Exception):
+    """Raises when email can not be delivered"""
+
+
+class OrderDoesNotExist(Exception):
+    """Raises when order does not found"""
@@ -1,35 +1,107 @@
 import logging
-import smtplib, ssl
+import time
 import uuid
+from contextlib import contextmanager
+from collections.abc import MutableSequence
+from contextvars import ContextVar
 from dataclasses import dataclass, field
+from functools import wraps
+from typing import Iterable, Iterator, Optional
 
-from src import constants
 from src.exceptions import ObjectAlreadyExists
-from src.management import InstanceManagement
+from src.mail import delivery_errors, mail_outbox
+from src.management import get_management_instance
+from src.metrics import metrics
 
-logger = logging.getLogger()
+logger = logging.getLogger(__name__)
+_deferred_registration: ContextVar[bool] = ContextVar(
+    "deferred_registration", default=False
+)
+_timed_construction: ContextVar[bool] = ContextVar("timed_construction", default=False)
 
 
 def send_email_data(message: str, recipients: list[str]):
-    """Email sender function."""
-
-    # TODO: Implement `aiosmtplib`
+    """Email sender function. Sends over the pooled SMTP connection."""
 
     recipients = [recipients] if isinstance(recipients, str) else recipients
 
-    port = constants.EMAIL_PORT
-    smtp_server = constants.EMAIL_SERVER
-    sender_email = constants.SENDER_EMAIL
-    password = constants.EMAIL_PASSWORD
-
+    started = time.perf_counter()
     try:
+        mail_outbox.transport.send(message, recipients)
         logger.info("The message has been sent successfully.")
-        context = ssl.create_default_context()
-        with smtplib.SMTP_SSL(smtp_server, port, context=context) as server:
-            server.login(sender_email, password)
-            server.sendmail(sender_email, recipients, message)
-    except smtplib.SMTPException as e:
-        logger.error(f"{e.args} SMTP error")
+    except delivery_errors() as e:
+        logger.error("%s SMTP error", e.args, extra={"recipients": recipients})
+        if metrics.enabled:
+            metrics.increment("emails_total", result="failed")
+    else:
+        if metrics.enabled:
+            metrics.increment("emails_total", result="sent")
+            metrics.observe("email_send_seconds", time.perf_counter() - started)
+
+
+@contextmanager
+def deferred_registration():
+    """
+    Builds models without the per-instance validation and registration.
+    The caller is responsible to validate and register them in bulk.
+    """
+    token = _deferred_registration.set(True)
+    try:
+        yield
+    finally:
+        _deferred_registration.reset(token)
+
+
+def registration_deferred() -> bool:
+    return _deferred_registration.get()
+
+
+def timed_construction(post_init):
+    """
+    Times the model `__post_init__`, from the validation to the registration.
+    Only the outermost call is timed, the base class ones run nested in it.
+    """
+
+    @wraps(post_init)
+    def timed_post_init(self):
+        if (
+            not metrics.enabled
+            or _deferred_registration.get()
+            or _timed_construction.get()
+        ):
+            return post_init(self)
+
+        token = _timed_construction.set(True)
+        try:
+            with metrics.timer(
+                "model_registration_seconds", model=self.__class__.__name__
+            ):
+                return post_init(self)
+        finally:
+            _timed_construction.reset(token)
+
+    return timed_post_init
+
+
+def register_instance(instance) -> None:
+    """Validates and registers the model instance in its management instance"""
+
+    _child_class = instance.__class__
+    management_instance = get_management_instance(_child_class)
+
+    if management_instance is not None:
+        if hasattr(_child_class, f"_validate_{_child_class.__name__.lower()}"):
+            method = getattr(
+                _child_class, f"_validate_{_child_class.__name__.lower()}"
+            )
+            try:
+                method(instance)
+            except Exception as e:
+                if isinstance(e, ValueError):
+                    raise ObjectAlreadyExists
+                else:
+                    raise e
+        management_instance.set_instance(instance)
 
 
 @dataclass
@@ -38,23 +110,180 @@ class BaseModel:
 
     id: str = field(init=False)
 
+    @timed_construction
     def __post_init__(self):
         self.id = str(uuid.uuid4())
-        _child_class = self.__class__
+        if _deferred_registration.get():
+            return
 
-        if hasattr(_child_class, f"_{_child_class.__name__}__management_instance"):
-            management_instance: InstanceManagement = getattr(
-                _child_class, f"_{_child_class.__name__}__management_instance"
-            )
-            if hasattr(_child_class, f"_validate_{_child_class.__name__.lower()}"):
-                method = getattr(
-                    _child_class, f"_validate_{_child_class.__name__.lower()}"
-                )
-                try:
-                    method(self)
-                except Exception as e:
-                    if isinstance(e, ValueError):
-                        raise ObjectAlreadyExists
-                    else:
-                        raise e
-            management_instance.set_instance(self)
+        register_instance(self)
+
+
+@dataclass(slots=True)
+class CompactBaseModel:
+    """
+    Slotted variant of `BaseModel` for holding millions of objects in memory.
+    The id is kept as a 128-bit integer and rendered to string on access.
+    """
+
+    _uid: int = field(init=False, repr=False)
+
+    @property
+    def id(self) -> str:
+        return str(uuid.UUID(int=self._uid))
+
+    @id.setter
+    def id(self, value: str) -> None:
+        self._uid = uuid.UUID(value).int
+
+    @timed_construction
+    def __post_init__(self):
+        self._uid = uuid.uuid4().int
+        if _deferred_registration.get():
+            return
+
+        register_instance(self)
+
+
+class OrderedIdMap(MutableSequence):
+    """
+    List of model instances which are unique by their id and indexed by it.
+
+    It keeps the list interface (positional and slice access, ``append``,
+    ``extend``, ``pop``, equality to lists) while membership checks, lookups
+    by id and appending are O(1). Removing or inserting an instance renumbers
+    the following ones, so it is O(n). Adding an instance whose id is already
+    present replaces it in place.
+    """
+
+    __slots__ = ("_instances", "_positions")
+
+    def __init__(self, instances: Iterable = ()):
+        self._instances: list = []
+        self._positions: dict[str, int] = {}  # by instance id
+        self.extend(instances)
+
+    def add(self, instance) -> None:
+        position = self._positions.get(instance.id)
+        if position is None:
+            self._positions[instance.id] = len(self._instances)
+            self._instances.append(instance)
+        else:
+            self._removed(self._instances[position])
+            self._instances[position] = instance
+        self._added(instance)
+
+    def append(self, instance) -> None:
+        self.add(instance)
+
+    def insert(self, index: int, instance) -> None:
+        self.remove(instance.id)
+        self._instances.insert(index, instance)
+        self._renumber()
+        self._added(instance)
+
+    def remove(self, instance) -> Optional[object]:
+        """
+        Removes and returns the instance by its id. Given an instance, removes
+        it as `list.remove` does, raising `ValueError` if it is missing.
+        """
+
+        if isinstance(instance, str):
+            position = self._positions.get(instance)
+            if position is None:
+                return None
+        elif instance in self:
+            position = self._positions[instance.id]
+        else:
+            raise ValueError(f"{instance!r} is not in the collection")
+
+        removed = self._instances[position]
+        del self[position]
+        return removed
+
+    def get(self, instance_id: str) -> Optional[object]:
+        position = self._positions.get(instance_id)
+        return None if position is None else self._instances[position]
+
+    def index(self, instance, start: int = 0, stop: Optional[int] = None) -> int:
+        if instance in self:
+            position = self._positions[instance.id]
+            if position in range(len(self._instances))[start:stop]:
+                return position
+        raise ValueError(f"{instance!r} is not in the collection")
+
+    def count(self, instance) -> int:
+        return int(instance in self)
+
+    def clear(self) -> None:
+        removed = self._instances
+        self._instances, self._positions = [], {}
+        for instance in removed:
+            self._removed(instance)
+
+    def __contains__(self, instance) -> bool:
+        """Checks the instance (or the instance id) is in the collection"""
+
+        if isinstance(instance, str):
+            return instance in self._positions
+        position = self._positions.get(getattr(instance, "id", None))
+        if position is None:
+            return False
+        stored = self._instances[position]
+        return stored is instance or stored == instance
+
+    def __getitem__(self, index):
+        return self._instances[index]
+
+    def __setitem__(self, index, instances) -> None:
+        replaced = list(self._instances)
+        replaced[index] = instances
+        self.clear()
+        self.extend(replaced)
+
+    def __delitem__(self, index) -> None:
+        removed = self._instances[index]
+        del self._instances[index]
+        if isinstance(index, slice):
+            self._positions = {}
+            self._renumber()
+        else:
+            removed = [removed]
+            del self._positions[removed[0].id]
+            self._renumber(index % (len(self._instances) + 1))
+        for instance in removed:
+            self._removed(instance)
+
+    def __iter__(self) -> Iterator:
+        return iter(self._instances)
+
+    def __len__(self) -> int:
+        return len(self._instances)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (OrderedIdMap, list, tuple)):
+            return self._instances == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self._instances!r})"
+
+    def __getstate__(self) -> dict:
+        return {"instances": self._instances}
+
+    def __setstate__(self, state: dict) -> None:
+        instances = state["instances"]
+        if isinstance(instances, dict):  # written before it kept the order as list
+            instances = instances.values()
+        self._instances, self._positions = [], {}
+        self.extend(instances)
+
+    def _added(self, instance) -> None:
+        """Called after the instance is added, for the subclasses to keep track"""
+
+    def _removed(self, instance) -> None:
+        """Called after the instance is removed (or replaced)"""
+
+    def _renumber(self, start: int = 0) -> None:
+        for position in range(start, len(self._instances)):
+            self._positions[self._instances[position].id] = position
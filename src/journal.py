@@ -0,0 +1,265 @@
+"""
+Append-only journal of order events.
+
+Every order change is appended as a JSON line. Lines are flushed and fsynced
+in batches (every `sync_every` events or `sync_interval` seconds). The
+journal can be replayed on top of the last snapshot to rebuild the orders
+after a crash, and compacted into a new snapshot to keep the replay short.
+
+Entries are numbered by a sequence which the snapshot remembers, so the
+entries already contained in the snapshot are skipped on replay (e.g. after
+a crash between saving the snapshot and truncating the journal).
+"""
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Optional
+
+from src import order as orders
+from src.constants import OrderDeliveryStatuses, OrderPaymentStatus
+from src.customer import customer_address_instances, customer_instances
+from src.employee import EmployeeRating, employee_instances, employee_rating_instances
+from src.helpers import deferred_registration
+from src.order import Order, OrderItem, order_instances
+from src.product import product_instances
+from src.snapshot import load_snapshot, save_snapshot, snapshot_metadata
+from src.stock import stock_reservations
+
+
+def _last_sequence(path: str, snapshot_path: Optional[str] = None) -> int:
+    """Returns the sequence number of the last journaled entry"""
+
+    sequence = 0
+    if snapshot_path is not None and os.path.exists(snapshot_path):
+        sequence = snapshot_metadata(snapshot_path)["journal_sequence"]
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    sequence = max(sequence, json.loads(line)["seq"])
+    return sequence
+
+
+def _item_data(item: OrderItem) -> dict:
+    return {
+        "id": item.id,
+        "product_id": item.product.id,
+        "qty": item.qty,
+        "item_price": item.item_price,
+    }
+
+
+class OrderJournal:
+    """Appends order events to the journal file"""
+
+    def __init__(
+        self,
+        path: str,
+        sync_every: int = 100,
+        sync_interval: float = 1.0,
+        snapshot_path: Optional[str] = None,
+        compact_every: Optional[int] = None,
+    ):
+        self.path = path
+        self.sync_every = sync_every
+        self.sync_interval = sync_interval
+        self.snapshot_path = snapshot_path
+        self.compact_every = compact_every
+        self._sequence = _last_sequence(path, snapshot_path)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._unsynced = 0
+        self._since_compaction = 0
+        self._synced_at = time.monotonic()
+
+    def attach(self) -> None:
+        """Starts journaling the order events"""
+
+        orders.order_listeners.append(self.record)
+
+    def detach(self) -> None:
+        if self.record in orders.order_listeners:
+            orders.order_listeners.remove(self.record)
+
+    def record(self, event: str, order: Order, data: dict) -> None:
+        entry = {"event": event, "order_id": order.id}
+        entry.update(self._encode(event, order, data))
+        with self._lock:
+            self._sequence += 1
+            entry["seq"] = self._sequence
+            line = json.dumps(entry, separators=(",", ":"))
+            self._file.write(f"{line}\n")
+            self._unsynced += 1
+            self._since_compaction += 1
+            if (
+                self._unsynced >= self.sync_every
+                or time.monotonic() - self._synced_at >= self.sync_interval
+            ):
+                self._sync()
+        if self.compact_every and self._since_compaction >= self.compact_every:
+            self.compact()
+
+    def sync(self) -> None:
+        with self._lock:
+            self._sync()
+
+    def compact(self) -> None:
+        """Saves a snapshot of all the registries and truncates the journal"""
+
+        if self.snapshot_path is None:
+            raise ValueError("Snapshot path is not configured")
+        with self._lock:
+            self._file.flush()
+            save_snapshot(self.snapshot_path, journal_sequence=self._sequence)
+            self._file.seek(0)
+            self._file.truncate()
+            self._sync()
+            self._since_compaction = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._sync()
+            self._file.close()
+
+    def _sync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._synced_at = time.monotonic()
+
+    @staticmethod
+    def _encode(event: str, order: Order, data: dict) -> dict:
+        if event == "created":
+            return {
+                "customer_id": order.customer.id,
+                "customer_address_id": order.customer_address.id,
+                "employee_id": order.employee.id,
+                "delivery_status": order.delivery_status,
+                "payment_status": order.payment_status,
+                "items": [_item_data(item) for item in order.items],
+            }
+        if event == "items_added":
+            return {"items": [_item_data(item) for item in data["items"]]}
+        if event == "cancelled":
+            return {
+                "delivery_status": order.delivery_status,
+                "payment_status": order.payment_status,
+            }
+        if event == "employee_rated":
+            rating = data["rating"]
+            return {
+                "rating_id": rating.id,
+                "value": rating.value,
+                "message": rating.message,
+                "created_at": rating.created_at.isoformat(),
+            }
+        return data
+
+
+def _build_items(items: list[dict]) -> list[OrderItem]:
+    built = []
+    for data in items:
+        with deferred_registration():
+            item = OrderItem(
+                product=product_instances.get_by("id", data["product_id"]),
+                qty=data["qty"],
+                item_price=data["item_price"],
+            )
+        item.id = data["id"]
+        built.append(item)
+    return built
+
+
+def _replay_created(entry: dict) -> None:
+    with deferred_registration():
+        order = Order(
+            customer=customer_instances.get_by("id", entry["customer_id"]),
+            customer_address=customer_address_instances.get_by(
+                "id", entry["customer_address_id"]
+            ),
+            employee=employee_instances.get_by("id", entry["employee_id"]),
+            items=_build_items(entry["items"]),
+            _order_delivery_status=entry["delivery_status"],
+            _order_payment_status=entry["payment_status"],
+            _ordered=entry["payment_status"] == OrderPaymentStatus.PAID.value,
+        )
+    order.id = entry["order_id"]
+    order_instances.set_instance(order)
+    order._reserve_items()
+
+
+def _replay_change(order: Order, entry: dict) -> None:
+    event = entry["event"]
+    if event == "items_added":
+        items = _build_items(entry["items"])
+        stock_reservations.reserve(
+            order.id, [(item.product, item.qty) for item in items]
+        )
+        for item in items:
+            order.items.add(item)
+    elif event == "item_removed":
+        item = order.items.remove(entry["item_id"])
+        if item is not None:
+            stock_reservations.release(order.id, [(item.product, item.qty)])
+    elif event == "item_qty_changed":
+        order.update_item_qty(entry["item_id"], entry["qty"])
+    elif event == "delivery_status_changed":
+        order._set_delivery_status(entry["status"])
+        if entry["status"] == OrderDeliveryStatuses.DELIVERED.value:
+            stock_reservations.consume(order.id)
+    elif event == "payment_status_changed":
+        order._set_payment_status(entry["status"])
+        order._ordered = entry["status"] == OrderPaymentStatus.PAID.value
+    elif event == "cancelled":
+        stock_reservations.release(order.id)
+        order._set_delivery_status(entry["delivery_status"])
+        order._set_payment_status(entry["payment_status"])
+        order._ordered = False
+    elif event == "employee_rated":
+        with deferred_registration():
+            rating = EmployeeRating(
+                value=entry["value"],
+                message=entry["message"],
+                created_at=datetime.fromisoformat(entry["created_at"]),
+            )
+        rating.id = entry["rating_id"]
+        employee_rating_instances.set_instance(rating)
+        order.employee.rating = rating
+
+
+def replay(path: str, after: int = 0) -> int:
+    """
+    Applies the journal events numbered above `after` (the sequence number
+    contained in the restored snapshot) to the registries, returns the number
+    of applied events. The journal must not be attached while replaying,
+    otherwise the replayed events are journaled again.
+    """
+
+    replayed = 0
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if entry["seq"] <= after:
+                continue
+            if entry["event"] == "created":
+                _replay_created(entry)
+            else:
+                _replay_change(order_instances.get_by("id", entry["order_id"]), entry)
+            replayed += 1
+    return replayed
+
+
+def recover(journal_path: str, snapshot_path: Optional[str] = None) -> int:
+    """Restores the last snapshot (if any) and replays the journal on top of it"""
+
+    after = 0
+    if snapshot_path is not None and os.path.exists(snapshot_path):
+        load_snapshot(snapshot_path)
+        after = snapshot_metadata(snapshot_path)["journal_sequence"]
+    if not os.path.exists(journal_path):
+        return 0
+    return replay(journal_path, after)
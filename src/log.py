@@ -0,0 +1,131 @@
+"""
+Structured, rate-limited and non-blocking logging of the package.
+
+Every module logs through its own ``logging.getLogger(__name__)`` logger with
+lazy ``%`` formatting and structured fields passed as ``extra``. The
+`configure_logging` function attaches a queue handler to the package logger:
+records are rate limited in the caller's thread and formatted and written by a
+background listener thread.
+"""
+import atexit
+import json
+import logging
+import queue
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+PACKAGE_LOGGER = "src"
+
+# attributes of every `LogRecord`, the rest are structured fields given as `extra`
+_RECORD_ATTRIBUTES = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", (), None))
+) | {"message", "asctime"}
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets through at most `burst` records of the same message (logger, level and
+    unformatted message) per `interval` seconds. The number of suppressed
+    records is reported in the `suppressed` field of the next passed record.
+    """
+
+    def __init__(self, burst: int = 10, interval: float = 60.0):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._windows: dict[tuple, list] = {}  # key -> [started, passed, suppressed]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = (record.name, record.levelno, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window is not None else 0
+                self._windows[key] = [now, 1, 0]
+            elif window[1] < self.burst:
+                window[1] += 1
+                suppressed, window[2] = window[2], 0
+            else:
+                window[2] += 1
+                return False
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class StructuredFormatter(logging.Formatter):
+    """Formats records as JSON lines including the structured fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(
+            (name, value)
+            for name, value in vars(record).items()
+            if name not in _RECORD_ATTRIBUTES
+        )
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+
+def configure_logging(
+    level: int = logging.INFO,
+    handler: Optional[logging.Handler] = None,
+    burst: int = 10,
+    interval: float = 60.0,
+) -> QueueListener:
+    """
+    Routes the package logs through a queue to the given handler (a stream
+    handler writing JSON lines by default), rate limiting repeated messages.
+    """
+
+    global _listener, _queue_handler
+
+    shutdown_logging()
+    if handler is None:
+        handler = logging.StreamHandler()
+        handler.setFormatter(StructuredFormatter())
+
+    _queue_handler = QueueHandler(queue.SimpleQueue())
+    _queue_handler.addFilter(RateLimitFilter(burst, interval))
+    _listener = QueueListener(
+        _queue_handler.queue, handler, respect_handler_level=True
+    )
+    _listener.start()
+
+    logger = logging.getLogger(PACKAGE_LOGGER)
+    logger.setLevel(level)
+    logger.addHandler(_queue_handler)
+    logger.propagate = False
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Flushes the queued records and detaches the queue handler"""
+
+    global _listener, _queue_handler
+
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _queue_handler is not None:
+        logger = logging.getLogger(PACKAGE_LOGGER)
+        logger.removeHandler(_queue_handler)
+        logger.propagate = True
+        _queue_handler = None
+
+
+atexit.register(shutdown_logging)
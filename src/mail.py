@@ -0,0 +1,291 @@
+import atexit
+import logging
+import sys
+import threading
+import time
+from concurrent.futures import Future, wait
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+
+from src import constants
+from src.exceptions import EmailDeliveryError
+from src.metrics import metrics
+
+if TYPE_CHECKING:  # imported lazily, only processes sending mails pay for them
+    import asyncio
+    import smtplib
+    import ssl
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def ssl_context() -> "ssl.SSLContext":
+    """Returns the SSL context shared by all the SMTP connections of the process"""
+
+    import ssl
+
+    return ssl.create_default_context()
+
+
+def delivery_errors() -> tuple[type[Exception], ...]:
+    """
+    Returns exceptions of a failed delivery. SMTP errors can only be raised
+    once `smtplib` is imported, so it is not imported here.
+    """
+
+    smtplib = sys.modules.get("smtplib")
+    if smtplib is None:
+        return OSError, EmailDeliveryError
+    return smtplib.SMTPException, OSError, EmailDeliveryError
+
+
+@dataclass
+class EmailMessage:
+    """Queued email waiting for the delivery"""
+
+    message: str
+    recipients: list[str]
+    attempts: int = 0
+    future: Future = field(default_factory=Future, repr=False)
+
+
+class SMTPTransport:
+    """
+    Keeps a single authenticated SMTP connection open and reuses it for every
+    message instead of connecting, handshaking and logging in per message.
+    """
+
+    def __init__(
+        self,
+        server: Optional[str] = None,
+        port: Optional[int] = None,
+        sender_email: Optional[str] = None,
+        password: Optional[str] = None,
+        use_ssl: bool = True,
+    ):
+        self.server = server
+        self.port = port
+        self.sender_email = sender_email
+        self.password = password
+        self.use_ssl = use_ssl
+        self._connection: Optional["smtplib.SMTP"] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> "smtplib.SMTP":
+        import smtplib
+
+        server = self.server or constants.EMAIL_SERVER
+        port = self.port or constants.EMAIL_PORT
+        if not server:
+            raise EmailDeliveryError("Email server is not configured")
+
+        if self.use_ssl:
+            connection = smtplib.SMTP_SSL(server, port, context=ssl_context())
+        else:
+            connection = smtplib.SMTP(server, port)
+
+        password = self.password or constants.EMAIL_PASSWORD
+        if password:
+            connection.login(self.sender_email or constants.SENDER_EMAIL, password)
+        return connection
+
+    def send(self, message: str, recipients: list[str]) -> None:
+        """Sends the message over the pooled connection, reconnecting if needed."""
+        import smtplib
+
+        with self._lock:
+            if self._connection is None:
+                self._connection = self._connect()
+            try:
+                self._connection.sendmail(
+                    self.sender_email or constants.SENDER_EMAIL, recipients, message
+                )
+            except smtplib.SMTPServerDisconnected:
+                self._reset()
+                raise
+            except smtplib.SMTPException:  # answered by the server, still connected
+                raise
+            except OSError:  # SMTPException is an OSError too, so it goes last
+                self._reset()
+                raise
+
+    def _reset(self) -> None:
+        """Drops the broken connection closing its socket"""
+
+        connection, self._connection = self._connection, None
+        try:
+            connection.close()
+        except OSError:
+            pass
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                try:
+                    self._connection.quit()
+                except delivery_errors():
+                    pass
+                self._connection = None
+
+
+class StubTransport:
+    """Transport keeping sent messages in memory, useful for the tests"""
+
+    def __init__(self):
+        self.sent: list[tuple[str, list[str]]] = []
+
+    def send(self, message: str, recipients: list[str]) -> None:
+        self.sent.append((message, list(recipients)))
+
+    def close(self) -> None:
+        pass
+
+
+class MailOutbox:
+    """
+    Asynchronous email outbox.
+
+    Messages are queued without blocking the caller and delivered by a
+    background event loop in batches over the transport's pooled connection.
+    Failed deliveries are retried with an exponential backoff, other errors
+    (e.g. of a malformed message) fail the message right away. Messages whose
+    futures have been cancelled are not sent.
+    """
+
+    def __init__(
+        self,
+        transport=None,
+        batch_size: int = 50,
+        max_retries: int = 3,
+        retry_delay: float = 0.5,
+    ):
+        self.transport = transport or SMTPTransport()
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._loop: Optional["asyncio.AbstractEventLoop"] = None
+        self._queue: Optional["asyncio.Queue"] = None
+        self._thread: Optional[threading.Thread] = None
+        self._worker_task: Optional["asyncio.Task"] = None
+        self._lock = threading.Lock()
+        self._pending: set[Future] = set()
+
+    def enqueue(self, message: str, recipients) -> Future:
+        """Queues the message and returns a future resolved once it is delivered"""
+
+        recipients = [recipients] if isinstance(recipients, str) else list(recipients)
+        email = EmailMessage(message, recipients)
+        self._pending.add(email.future)
+        email.future.add_done_callback(self._pending.discard)
+
+        loop = self._ensure_started()
+        loop.call_soon_threadsafe(self._queue.put_nowait, email)
+        return email.future
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Blocks until every queued message is delivered or given up"""
+
+        wait(list(self._pending), timeout=timeout)
+
+    def set_transport(self, transport) -> None:
+        self.transport.close()
+        self.transport = transport
+
+    def close(self) -> None:
+        with self._lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._stop)
+                self._thread.join()
+                self._loop.close()
+                self._loop = self._queue = self._thread = self._worker_task = None
+        self.transport.close()
+
+    def _ensure_started(self) -> "asyncio.AbstractEventLoop":
+        import asyncio
+
+        with self._lock:
+            if self._loop is None:
+                started = threading.Event()
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._run, args=(started,), name="mail-outbox", daemon=True
+                )
+                self._thread.start()
+                started.wait()
+            return self._loop
+
+    def _run(self, started: threading.Event) -> None:
+        import asyncio
+
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue()
+        self._worker_task = self._loop.create_task(self._worker())
+        self._loop.call_soon(started.set)
+        self._loop.run_forever()
+
+    def _stop(self) -> None:
+        self._worker_task.add_done_callback(lambda _: self._loop.stop())
+        self._worker_task.cancel()
+
+    async def _worker(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self.batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            failed = await self._loop.run_in_executor(
+                None, self._deliver_batch, batch
+            )
+            for email, error in failed:
+                self._retry_or_fail(email, error)
+
+    def _deliver_batch(self, batch: list[EmailMessage]) -> list:
+        """Sends the batch over a single connection and returns failed messages"""
+
+        failed = []
+        for email in batch:
+            if email.future.cancelled():
+                continue
+            email.attempts += 1
+            started = time.perf_counter()
+            try:
+                self.transport.send(email.message, email.recipients)
+            except Exception as e:
+                failed.append((email, e))
+                if metrics.enabled:
+                    metrics.increment("emails_total", result="failed")
+            else:
+                if not email.future.done():
+                    email.future.set_result(True)
+                if metrics.enabled:
+                    metrics.increment("emails_total", result="sent")
+                    metrics.observe(
+                        "email_send_seconds", time.perf_counter() - started
+                    )
+        return failed
+
+    def _retry_or_fail(self, email: EmailMessage, error: Exception) -> None:
+        if (
+            isinstance(error, EmailDeliveryError)
+            or not isinstance(error, delivery_errors())
+            or email.attempts >= self.max_retries
+        ):
+            logger.error(
+                "%s SMTP error", error.args, extra={"recipients": email.recipients}
+            )
+            if not email.future.done():
+                email.future.set_exception(error)
+            return
+
+        delay = self.retry_delay * 2 ** (email.attempts - 1)
+        self._loop.call_later(delay, self._queue.put_nowait, email)
+
+
+mail_outbox = MailOutbox()
+
+
+@atexit.register
+def _flush_mail_outbox() -> None:
+    mail_outbox.flush(timeout=10)
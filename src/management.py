@@ -1,12 +1,320 @@
+import threading
+from contextlib import ExitStack, nullcontext
+from operator import attrgetter
+from typing import Any, Callable, ContextManager, Iterable, Iterator, Optional
+
+from src.exceptions import ObjectAlreadyExists
+from src.metrics import metrics
+
+registries: dict[str, "InstanceManagement"] = {}  # named registries by name
+
+
+def get_management_instance(model_class) -> Optional["InstanceManagement"]:
+    """Returns management instance declared by the model class, if any"""
+
+    return getattr(model_class, f"_{model_class.__name__}__management_instance", None)
+
+
 class InstanceManagement:
-    def __init__(self, instances: list):
+    """
+    In-memory registry of model instances.
+
+    Besides the insertion ordered list of instances, the registry maintains
+    hash indexes declared by attribute paths (e.g. ``"sku"``, ``"user.id"``):
+
+    * ``unique_indexes`` map a key to exactly one instance
+    * ``indexes`` map a key to every instance sharing it
+
+    The ``id`` unique index is always maintained.
+
+    In the ``concurrent`` mode unique keys are checked and inserted atomically
+    under striped locks: a key is guarded by one of ``stripes`` locks chosen by
+    its hash, so inserts of unrelated keys don't contend.
+
+    Named registries can be attached to a storage backend (see `src.storage`).
+    Registered instances are then persisted, and lookups missing in memory are
+    lazily rehydrated from the backend. The stored unique keys (except the
+    ids, which are fresh uuids) are loaded once on attaching, so registering
+    an instance doesn't query the backend.
+    """
+
+    def __init__(
+        self,
+        instances: list,
+        unique_indexes: Iterable[str] = (),
+        indexes: Iterable[str] = (),
+        concurrent: bool = False,
+        stripes: int = 16,
+        name: Optional[str] = None,
+    ):
         self.instances = instances
+        self.concurrent = concurrent
+        self.name = name
+        self.backend = None
+        self._stripes = [threading.Lock() for _ in range(stripes if concurrent else 0)]
+        self._unique_keys = {
+            name: attrgetter(name) for name in ("id", *unique_indexes)
+        }
+        self._keys = {name: attrgetter(name) for name in indexes}
+        self._unique_indexes: dict[str, dict] = {}
+        self._indexes: dict[str, dict[Any, dict]] = {}
+        self._loaded_keys: set[tuple] = set()
+        self._stored_keys: dict[str, set] = {}  # unique keys in the backend
+        self._rebuild_indexes()
+        if name is not None:
+            registries[name] = self
+
+    @property
+    def index_keys(self) -> dict[str, attrgetter]:
+        """Returns key getters of all the indexes by index name"""
+
+        return {**self._unique_keys, **self._keys}
+
+    def _rebuild_indexes(self) -> None:
+        self._unique_indexes = {name: {} for name in self._unique_keys}
+        self._indexes = {name: {} for name in self._keys}
+        self._loaded_keys = set()
+        for instance in self.instances:
+            self._index_instance(instance)
+
+    def _index_instance(self, instance) -> None:
+        for name, key in self._unique_keys.items():
+            self._unique_indexes[name][key(instance)] = instance
+        for name, key in self._keys.items():
+            self._indexes[name].setdefault(key(instance), {})[instance.id] = instance
+
+    def _lock_keys(self, keys: Iterable[tuple]) -> ContextManager:
+        """Acquires stripe locks of the given keys in a stable order"""
+
+        if not self.concurrent:
+            return nullcontext()
+
+        stack = ExitStack()
+        for stripe in sorted({hash(key) % len(self._stripes) for key in keys}):
+            stack.enter_context(self._stripes[stripe])
+        return stack
+
+    def _lock_all(self) -> ContextManager:
+        if not self.concurrent:
+            return nullcontext()
+
+        stack = ExitStack()
+        for lock in self._stripes:
+            stack.enter_context(lock)
+        return stack
+
+    def attach_backend(self, backend) -> None:
+        """Persists the registry in the given storage backend"""
+
+        if self.name is None:
+            raise ValueError("Only named registries can be persisted")
+        backend.register(self)
+        self.backend = backend
+        self._stored_keys = {
+            name: set(backend.keys(self, name))
+            for name in self._unique_keys
+            if name != "id"
+        }
+
+    def evict(self) -> None:
+        """Drops the instances from memory keeping them in the storage backend"""
+
+        if self.backend is not None:
+            self.backend.flush()
+        with self._lock_all():
+            self.instances = []
+            self._rebuild_indexes()
+
+    def restore(self, instances: list) -> None:
+        """Replaces the in-memory instances (e.g. from a snapshot) and reindexes them"""
+
+        with self._lock_all():
+            self.instances = instances
+            self._rebuild_indexes()
 
     def set_empty_instances(self):
-        self.instances = []
+        with self._lock_all():
+            self.instances = []
+            self._rebuild_indexes()
+            if self.backend is not None:
+                self.backend.clear(self)
+                for stored_keys in self._stored_keys.values():
+                    stored_keys.clear()
 
     def set_instance(self, instance):
-        self.instances.append(instance)
+        keys = [(name, key(instance)) for name, key in self._unique_keys.items()]
+        with self._lock_keys(keys):
+            for name, key in keys:
+                if key in self._unique_indexes[name] or self._stored_key(name, key):
+                    raise ObjectAlreadyExists
+            self.instances.append(instance)
+            self._index_instance(instance)
+        self.persist(instance)
+
+    def set_instances(self, instances: list):
+        """Registers all given instances at once, or none of them"""
+
+        with self._lock_all():
+            for name, key in self._unique_keys.items():
+                index = self._unique_indexes[name]
+                keys = [key(instance) for instance in instances]
+                if len(set(keys)) != len(keys) or any(
+                    k in index or self._stored_key(name, k) for k in keys
+                ):
+                    raise ObjectAlreadyExists
+            self.instances.extend(instances)
+            for instance in instances:
+                self._index_instance(instance)
+        for instance in instances:
+            self.persist(instance)
+
+    def persist(self, instance) -> None:
+        """Schedules saving of the changed instance in the storage backend"""
+
+        if self.backend is not None:
+            self.backend.save(self, instance)
+            for name, stored_keys in self._stored_keys.items():
+                stored_keys.add(self._unique_keys[name](instance))
+
+    def reindex(self, instance, index: str, old_key) -> None:
+        """Moves the changed instance from the old key of the non-unique index"""
+
+        new_key = self._keys[index](instance)
+        if new_key == old_key:
+            return
+        with self._lock_keys([(index, old_key), (index, new_key)]):
+            keyed = self._indexes[index]
+            bucket = keyed.get(old_key)
+            if bucket is None or bucket.pop(instance.id, None) is None:
+                return  # the instance is not registered
+            if not bucket:
+                del keyed[old_key]
+            keyed.setdefault(new_key, {})[instance.id] = instance
 
     def get_instances(self):
         return self.instances
+
+    def exists(self, index: str, key) -> bool:
+        """Returns is there any instance stored under the given index key"""
+
+        if metrics.enabled:
+            return self._measured(self._exists, index, key)
+        return self._exists(index, key)
+
+    def get_by(self, index: str, key) -> Optional[Any]:
+        """Returns the instance stored under the given unique index key"""
+
+        if metrics.enabled:
+            return self._measured(self._get_by, index, key)
+        return self._get_by(index, key)
+
+    def iter_by(self, index: str, key) -> Iterator:
+        """
+        Iterates instances stored under the given non-unique index key at the
+        time of the call, instances registered later are not iterated.
+        """
+
+        if metrics.enabled:
+            return self._measured(self._iter_by, index, key)
+        return self._iter_by(index, key)
+
+    def _exists(self, index: str, key) -> bool:
+        if index in self._unique_indexes:
+            return key in self._unique_indexes[index] or self._stored(index, key)
+        return bool(self._indexes[index].get(key)) or self._stored(index, key)
+
+    def _get_by(self, index: str, key) -> Optional[Any]:
+        instance = self._unique_indexes[index].get(key)
+        if instance is None and self.backend is not None:
+            self._rehydrate(self.backend.rows(self, index, key))
+            instance = self._unique_indexes[index].get(key)
+        return instance
+
+    def _iter_by(self, index: str, key) -> Iterator:
+        if self.backend is not None and (index, key) not in self._loaded_keys:
+            self._rehydrate(self.backend.rows(self, index, key))
+            self._loaded_keys.add((index, key))
+        # a snapshot, the bucket may change while the caller is iterating
+        return iter(tuple(self._indexes[index].get(key, {}).values()))
+
+    def _measured(self, lookup: Callable, index: str, key):
+        """Counts and times the lookup"""
+
+        metrics.increment("registry_lookups_total", registry=self.name, index=index)
+        with metrics.timer("registry_lookup_seconds", registry=self.name, index=index):
+            return lookup(index, key)
+
+    def filter_by(self, index: str, key) -> list:
+        """Returns instances stored under the given non-unique index key"""
+
+        return list(self.iter_by(index, key))
+
+    def select(
+        self, where: dict[str, Any], exclude: Optional[dict[str, Any]] = None
+    ) -> list:
+        """
+        Returns instances matching all the `where` non-unique index keys and
+        none of the `exclude` ones, e.g.
+        ``select({"payment_status": 2}, exclude={"delivery_status": 3})``.
+        Only the smallest matching index bucket is scanned. The matches are
+        loaded in memory, so the `exclude` keys are checked in memory only.
+        """
+
+        for index, key in where.items():
+            self.iter_by(index, key)  # rehydrates the stored instances if any
+        if where:
+            buckets = [
+                self._indexes[index].get(key, {}) for index, key in where.items()
+            ]
+        else:
+            self.load_all()
+            buckets = [self._unique_indexes["id"]]
+        buckets.sort(key=len)
+        excluded = [
+            self._indexes[index].get(key, {}) for index, key in (exclude or {}).items()
+        ]
+        return [
+            instance
+            for instance_id, instance in buckets[0].items()
+            if all(instance_id in bucket for bucket in buckets[1:])
+            and not any(instance_id in bucket for bucket in excluded)
+        ]
+
+    def load_all(self) -> None:
+        """Rehydrates every instance stored in the storage backend"""
+
+        if self.backend is not None:
+            self._rehydrate(self.backend.rows(self))
+
+    def _stored(self, index: str, key) -> bool:
+        if self.backend is None:
+            return False
+        stored_keys = self._stored_keys.get(index)
+        if stored_keys is not None:
+            return key in stored_keys
+        return self.backend.exists(self, index, key)
+
+    def _stored_key(self, index: str, key) -> bool:
+        """Checks a unique key of a new instance, new ids are not looked up"""
+
+        return index != "id" and self._stored(index, key)
+
+    def _rehydrate(self, rows: Iterable[tuple]) -> None:
+        """
+        Loads stored (id, data) rows which are not in memory yet. The rows are
+        unpickled before taking the locks, as resolving their references may
+        rehydrate other instances.
+        """
+
+        loaded = [
+            self.backend.loads(data)
+            for instance_id, data in rows
+            if instance_id not in self._unique_indexes["id"]
+        ]
+        for instance in loaded:
+            keys = [(name, key(instance)) for name, key in self._unique_keys.items()]
+            with self._lock_keys(keys):
+                if instance.id in self._unique_indexes["id"]:
+                    continue  # rehydrated by another thread meanwhile
+                self.instances.append(instance)
+                self._index_instance(instance)
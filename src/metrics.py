@@ -0,0 +1,141 @@
+"""
+In-process metrics of the hot paths.
+
+Instrumentation is opt-in: every instrumented call site checks
+``metrics.enabled`` first, so disabled metrics cost a single attribute lookup.
+
+    metrics.enable()
+    ...
+    print(metrics.export())  # Prometheus text exposition format
+"""
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return name, tuple(sorted(labels.items()))
+
+
+def _escape(value) -> str:
+    """Escapes the label value as the text exposition format requires"""
+
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _render_labels(labels: tuple, extra: tuple = ()) -> str:
+    """Renders the labels skipping the ones without value (e.g. registry=None)"""
+
+    pairs = [(name, value) for name, value in (*labels, *extra) if value is not None]
+    if not pairs:
+        return ""
+    rendered = ",".join(f'{name}="{_escape(value)}"' for name, value in pairs)
+    return f"{{{rendered}}}"
+
+
+class Histogram:
+    """
+    Observed values with their count and sum. Percentiles are computed over
+    the latest `max_samples` observations.
+    """
+
+    def __init__(self, max_samples: int = 10_000):
+        self.count = 0
+        self.sum = 0.0
+        self.samples: deque[float] = deque(maxlen=max_samples)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        self.samples.append(value)
+
+    def percentile(self, q: float) -> float:
+        """Returns the `q` (0..1) percentile of the sampled values"""
+
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+
+class MetricsRegistry:
+    """Counters and histograms keyed by name and labels"""
+
+    def __init__(self, max_samples: int = 10_000):
+        self.enabled = False
+        self.max_samples = max_samples
+        self._lock = threading.Lock()
+        self.counters: dict[tuple, float] = {}
+        self.histograms: dict[tuple, Histogram] = {}
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+
+    def increment(self, name: str, value: float = 1, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(self.max_samples)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        """Observes the duration of the block in seconds"""
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def counter_value(self, name: str, **labels) -> float:
+        return self.counters.get(_key(name, labels), 0)
+
+    def histogram(self, name: str, **labels) -> Histogram:
+        return self.histograms.get(_key(name, labels)) or Histogram(0)
+
+    def export(self) -> str:
+        """Renders the metrics in the Prometheus text exposition format"""
+
+        lines = []
+        with self._lock:
+            counters = sorted(self.counters.items())
+            histograms = sorted(self.histograms.items(), key=lambda item: item[0])
+            typed = set()
+            for (name, labels), value in counters:
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f"# TYPE {name} counter")
+                lines.append(f"{name}{_render_labels(labels)} {value}")
+
+            for (name, labels), histogram in histograms:
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f"# TYPE {name} summary")
+                for q in QUANTILES:
+                    quantile = _render_labels(labels, (("quantile", q),))
+                    lines.append(f"{name}{quantile} {histogram.percentile(q)}")
+                lines.append(f"{name}_sum{_render_labels(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{_render_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
@@ -1,6 +1,8 @@
 import logging
+import time
+from itertools import islice
 from dataclasses import dataclass, field
-from typing import Optional
+from typing import Any, Callable, Iterable, Iterator, Optional
 
 from .constants import OrderPaymentStatus, OrderDeliveryStatuses
 from .customer import Customer, CustomerAddress
@@ -8,24 +10,80 @@ from .employee import Employee, EmployeeRating
 from .exceptions import (
     StockQuantityIsNotEnough,
     StatusDoesNotExists,
-    OrderAlreadyHasBeenPaid,
     InvalidCustomerAddress,
     ItemsDoNotFound,
+    OrderDoesNotExist,
     RateError,
 )
-from .helpers import BaseModel
+from .helpers import (
+    BaseModel,
+    OrderedIdMap,
+    deferred_registration,
+    register_instance,
+    registration_deferred,
+    timed_construction,
+)
 from .product import Product
 from .management import InstanceManagement
+from .metrics import metrics
+from .stock import stock_reservations
+from .transitions import (
+    StateMachine,
+    Transition,
+    delivery_state_machine,
+    payment_state_machine,
+)
 
-order_instances = InstanceManagement([])
-logger = logging.getLogger()
+order_instances = InstanceManagement(
+    [],
+    indexes=("customer.id", "employee.id", "delivery_status", "payment_status"),
+    name="orders",
+)
+logger = logging.getLogger(__name__)
+# the orders in these statuses don't hold stock reservations
+RELEASED_DELIVERY_STATUSES = frozenset(
+    status.value
+    for status in (
+        OrderDeliveryStatuses.DELIVERED,
+        OrderDeliveryStatuses.RETURNED,
+        OrderDeliveryStatuses.CANCELED,
+    )
+)
+order_listeners: list[Callable[[str, "Order", dict], None]] = []
 
 
-@dataclass
-class OrderItem(BaseModel):
-    product: Product
-    qty: float
-    item_price: float
+def notify_order_listeners(event: str, order: "Order", **data) -> None:
+    """Notifies order listeners (e.g. the order journal) about the order event"""
+
+    for listener in order_listeners:
+        listener(event, order, data)
+
+
+def rebuild_stock_reservations() -> None:
+    """
+    Reserves the stock of the registered orders from scratch, e.g. after the
+    orders and products have been restored from a snapshot.
+    """
+
+    stock_reservations.clear()
+    for order in order_instances.get_instances():
+        order._reserve_items()
+
+
+class OrderItemMixin:
+    """Behaviour of the order items shared by `OrderItem` and its compact variant"""
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        items = getattr(self, "_order_items", None)
+        if items is None or name not in ("qty", "item_price"):
+            object.__setattr__(self, name, value)
+            return
+
+        previous_total = self.item_total
+        object.__setattr__(self, name, value)
+        items._add_to_total(self.item_total - previous_total)
 
     @property
     def item_total(self) -> float:
@@ -37,24 +95,111 @@ class OrderItem(BaseModel):
         if self.qty < 0:
             raise ValueError
 
+    @timed_construction
     def __post_init__(self):
-        self.validate_qty()
+        if not registration_deferred():
+            self.validate_qty()
         super().__post_init__()
 
 
 @dataclass
-class Order(BaseModel):
-    customer: Customer
-    customer_address: CustomerAddress
-    employee: Employee
-    employee_rating: Optional[EmployeeRating] = None
-    items: list[OrderItem] = field(default_factory=list)
-    _order_delivery_status: int = (
-        OrderDeliveryStatuses.WAITING.value
-    )  # OrderDeliveryStatuses
-    _order_payment_status: int = OrderPaymentStatus.WAITING.value  # OrderPaymentStatus
-    _ordered: bool = False
-    __management_instance = order_instances
+class OrderItem(OrderItemMixin, BaseModel):
+    product: Product
+    qty: float
+    item_price: float
+    _order_items: Optional["OrderItemMap"] = field(
+        default=None, init=False, repr=False, compare=False
+    )  # the items of the order holding the item
+
+
+class OrderItemMap(OrderedIdMap):
+    """
+    Order items list, indexed by their id, with the running total of the items,
+    which is kept up to date on adding, removing and changing the items. The total
+    is summed with compensation of the rounding errors, so it doesn't drift
+    over many changes. The items are indexed by their product as well.
+    """
+
+    __slots__ = ("_total", "_compensation", "_by_product")
+
+    def __init__(self, items: Iterable[OrderItem] = ()):
+        self._total = 0
+        self._compensation = 0
+        self._by_product: dict[str, dict[str, OrderItem]] = {}
+        super().__init__(items)
+
+    def _added(self, item: OrderItem) -> None:
+        item._order_items = self
+        self._add_to_total(item.item_total)
+        self._by_product.setdefault(item.product.id, {})[item.id] = item
+
+    def _removed(self, item: OrderItem) -> None:
+        item._order_items = None
+        if self:
+            self._add_to_total(-item.item_total)
+        else:
+            self._total = self._compensation = 0
+        product_items = self._by_product[item.product.id]
+        del product_items[item.id]
+        if not product_items:
+            del self._by_product[item.product.id]
+
+    @property
+    def total(self) -> float:
+        return self._total + self._compensation
+
+    def _add_to_total(self, value: float) -> None:
+        """Adds the value to the total (Neumaier summation)"""
+
+        total = self._total + value
+        if abs(self._total) >= abs(value):
+            self._compensation += (self._total - total) + value
+        else:
+            self._compensation += (value - total) + self._total
+        self._total = total
+
+    def get_line(self, product_id: str, item_price: float) -> Optional[OrderItem]:
+        """Returns the item of the product sold for the given price, if any"""
+
+        for item in self._by_product.get(product_id, {}).values():
+            if item.item_price == item_price:
+                return item
+        return None
+
+    def __getstate__(self) -> dict:
+        return {**super().__getstate__(), "total": self.total}
+
+    def __setstate__(self, state: dict) -> None:
+        self._total = 0
+        self._compensation = 0
+        self._by_product = {}
+        super().__setstate__(state)
+        self._total = state["total"]
+        self._compensation = 0
+
+
+@dataclass
+class BulkCreateResult:
+    """Result of the bulk order creation"""
+
+    orders: list = field(default_factory=list)
+    errors: dict[int, Exception] = field(default_factory=dict)  # by row index
+
+
+@dataclass
+class StatusChangeResult:
+    """Result of the batch order status change"""
+
+    status: int
+    changed: list[str] = field(default_factory=list)  # order ids
+    # by order id, the status is kept changed if only its hook or listener failed
+    errors: dict[str, Exception] = field(default_factory=dict)
+
+
+class OrderMixin:
+    """Behaviour of the orders shared by `Order` and its compact variant"""
+
+    __slots__ = ()
 
     @property
     def ordered(self):
@@ -68,18 +213,24 @@ class Order(BaseModel):
     def payment_status(self):
         return self._order_payment_status
 
+    @property
+    def reserves_stock(self) -> bool:
+        """Whether the order items hold stock reservations (not closed yet)"""
+
+        return self._order_delivery_status not in RELEASED_DELIVERY_STATUSES
+
     @staticmethod
     def validate_order_delivery_status(delivery_status: int) -> None:
         """Validates the order delivery status"""
 
-        if delivery_status not in OrderDeliveryStatuses.values():
+        if delivery_status not in OrderDeliveryStatuses.value_set():
             raise StatusDoesNotExists
 
     @staticmethod
     def validate_order_pyment_status(payment_status: int) -> None:
         """Validates the order payment status"""
 
-        if payment_status not in OrderPaymentStatus.values():
+        if payment_status not in OrderPaymentStatus.value_set():
             raise StatusDoesNotExists
 
     @staticmethod
@@ -92,26 +243,29 @@ class Order(BaseModel):
         if not customer.is_address_valid(address):
             raise InvalidCustomerAddress
 
+    def _set_delivery_status(self, status: int) -> None:
+        """Sets the delivery status keeping the status index up to date"""
+
+        previous = self._order_delivery_status
+        self._order_delivery_status = status
+        order_instances.reindex(self, "delivery_status", previous)
+
+    def _set_payment_status(self, status: int) -> None:
+        """Sets the payment status keeping the status index up to date"""
+
+        previous = self._order_payment_status
+        self._order_payment_status = status
+        order_instances.reindex(self, "payment_status", previous)
+
     def change_order_delivery_status(self, status: int) -> None:
         """Updates order delivery status"""
         if not self.items:
             raise ItemsDoNotFound
 
-        self.validate_order_delivery_status(status)
-
-        if self.ordered and status not in [
-            OrderDeliveryStatuses.CANCELED.value,
-            OrderDeliveryStatuses.DELIVERED.value,
-            OrderDeliveryStatuses.RETURNED.value,
-        ]:
-            raise OrderAlreadyHasBeenPaid
-
-        if status == OrderDeliveryStatuses.CANCELED.value:
-            self._cancel_order()
-        else:
-            if status == self._order_delivery_status:
-                logger.warning("You have updated the status repeatedly")
-            self._order_delivery_status = status
+        transition = delivery_state_machine.resolve(
+            self.ordered, self._order_delivery_status, status
+        )
+        self._apply_delivery_transition(transition)
 
     def change_order_payment_status(self, status: int) -> None:
         """Updates order payment status"""
@@ -119,72 +273,440 @@ class Order(BaseModel):
         if not self.items:
             raise ItemsDoNotFound
 
-        self.validate_order_pyment_status(status)
-
-        if self.ordered and status not in [
-            OrderPaymentStatus.CANCELED.value,
-            OrderPaymentStatus.REFUNDED.value,
-        ]:
-            raise OrderAlreadyHasBeenPaid
+        transition = payment_state_machine.resolve(
+            self.ordered, self._order_payment_status, status
+        )
+        self._apply_payment_transition(transition)
 
-        if status == OrderPaymentStatus.CANCELED.value:
+    def _apply_delivery_transition(
+        self, transition: Transition, warn: bool = True
+    ) -> None:
+        started = time.perf_counter() if metrics.enabled else 0
+        if transition.cancels:
             self._cancel_order()
         else:
-            if status == self._order_payment_status:
-                logger.warning("You have updated the status repeatedly")
-            self._order_payment_status = status
+            if warn and transition.repeated:
+                logger.warning(
+                    "You have updated the status repeatedly",
+                    extra={"order_id": self.id, "status": transition.target},
+                )
+            self._set_delivery_status(transition.target)
+            if transition.target == OrderDeliveryStatuses.DELIVERED.value:
+                stock_reservations.consume(self.id)
+            notify_order_listeners(
+                "delivery_status_changed", self, status=transition.target
+            )
+        order_instances.persist(self)
+        delivery_state_machine.run_hooks(self, transition)
+        if metrics.enabled:
+            metrics.increment(
+                "order_transitions_total", field="delivery", status=transition.target
+            )
+            metrics.observe(
+                "order_transition_seconds",
+                time.perf_counter() - started,
+                field="delivery",
+            )
 
-        if self._order_payment_status == OrderPaymentStatus.PAID.value:
-            self._ordered = True
+    def _apply_payment_transition(
+        self, transition: Transition, warn: bool = True
+    ) -> None:
+        started = time.perf_counter() if metrics.enabled else 0
+        if transition.cancels:
+            self._cancel_order()
         else:
-            self._ordered = False
+            if warn and transition.repeated:
+                logger.warning(
+                    "You have updated the status repeatedly",
+                    extra={"order_id": self.id, "status": transition.target},
+                )
+            self._set_payment_status(transition.target)
+
+        self._ordered = self._order_payment_status == OrderPaymentStatus.PAID.value
+        if not transition.cancels:
+            notify_order_listeners(
+                "payment_status_changed", self, status=transition.target
+            )
+        order_instances.persist(self)
+        payment_state_machine.run_hooks(self, transition)
+        if metrics.enabled:
+            metrics.increment(
+                "order_transitions_total", field="payment", status=transition.target
+            )
+            metrics.observe(
+                "order_transition_seconds",
+                time.perf_counter() - started,
+                field="payment",
+            )
+
+    @staticmethod
+    def change_orders_delivery_status(orders: list, status: int) -> None:
+        """Updates delivery status of all the orders, or of none if any can't move"""
+
+        transitions = OrderMixin._resolve_transitions(
+            delivery_state_machine, orders, status, "_order_delivery_status"
+        )
+        for order, transition in zip(orders, transitions):
+            order._apply_delivery_transition(transition)
 
-    def add_item(self, item: OrderItem) -> None:
-        """Adds an item in order"""
+    @staticmethod
+    def change_orders_payment_status(orders: list, status: int) -> None:
+        """Updates payment status of all the orders, or of none if any can't move"""
 
-        self.items.append(item)
+        transitions = OrderMixin._resolve_transitions(
+            payment_state_machine, orders, status, "_order_payment_status"
+        )
+        for order, transition in zip(orders, transitions):
+            order._apply_payment_transition(transition)
+
+    @staticmethod
+    def batch_change_delivery_status(
+        order_ids: Iterable[str], status: int
+    ) -> StatusChangeResult:
+        """
+        Updates delivery status of the orders by their ids. Transitions are
+        validated once per distinct current state of the orders, failed orders
+        are reported in the result instead of raising. Repeated ids are changed
+        once.
+        """
+
+        return OrderMixin._batch_change_status(
+            delivery_state_machine,
+            order_ids,
+            status,
+            "_order_delivery_status",
+            "_apply_delivery_transition",
+        )
+
+    @staticmethod
+    def batch_change_payment_status(
+        order_ids: Iterable[str], status: int
+    ) -> StatusChangeResult:
+        """
+        Updates payment status of the orders by their ids. Transitions are
+        validated once per distinct current state of the orders, failed orders
+        are reported in the result instead of raising. Repeated ids are changed
+        once.
+        """
+
+        return OrderMixin._batch_change_status(
+            payment_state_machine,
+            order_ids,
+            status,
+            "_order_payment_status",
+            "_apply_payment_transition",
+        )
+
+    @staticmethod
+    def _batch_change_status(
+        machine: StateMachine,
+        order_ids: Iterable[str],
+        status: int,
+        attribute: str,
+        apply: str,
+    ) -> StatusChangeResult:
+        result = StatusChangeResult(status)
+        states: dict[tuple[bool, int], list] = {}
+        for order_id in dict.fromkeys(order_ids):  # unique, in the given order
+            order = order_instances.get_by("id", order_id)
+            if order is None:
+                result.errors[order_id] = OrderDoesNotExist()
+            elif not order.items:
+                result.errors[order_id] = ItemsDoNotFound()
+            else:
+                state = (order.ordered, getattr(order, attribute))
+                states.setdefault(state, []).append(order)
+
+        for (paid, source), orders in states.items():
+            try:
+                transition = machine.resolve(paid, source, status)
+            except Exception as e:
+                result.errors.update((order.id, e) for order in orders)
+                continue
+
+            if transition.repeated:
+                logger.warning(
+                    "You have updated the status repeatedly",
+                    extra={"orders": len(orders), "status": status},
+                )
+            for order in orders:
+                try:
+                    getattr(order, apply)(transition, warn=False)
+                except Exception as e:  # e.g. of a failed hook or listener
+                    result.errors[order.id] = e
+                    continue
+                result.changed.append(order.id)
+        return result
+
+    @staticmethod
+    def _resolve_transitions(
+        machine: StateMachine, orders: list, status: int, attribute: str
+    ) -> list[Transition]:
+        transitions = []
+        for order in orders:
+            if not order.items:
+                raise ItemsDoNotFound
+            transitions.append(
+                machine.resolve(order.ordered, getattr(order, attribute), status)
+            )
+        return transitions
+
+    def add_item(self, item: OrderItem, merge: bool = False) -> None:
+        """
+        Adds an item in order and reserves its product stock.
+        In the `merge` mode the quantity of the item is added to the existing
+        order line of the same product and price instead, if there is any.
+        """
+
+        line = self.items.get_line(item.product.id, item.item_price) if merge else None
+        if line is not None:
+            self._merge_item(line, item)
+            return
+
+        stock_reservations.reserve(self.id, [(item.product, item.qty)])
+        self.items.add(item)
+        notify_order_listeners("items_added", self, items=[item])
+        order_instances.persist(self)
+
+    def _merge_item(self, line: OrderItem, item: OrderItem) -> None:
+        """Adds the item quantity to the order line of the same product"""
+
+        previous_qty = line.qty
+        line.qty = previous_qty + item.qty
+        try:
+            line.validate_qty()
+            stock_reservations.reserve(self.id, [(item.product, item.qty)])
+        except Exception:
+            line.qty = previous_qty
+            raise
+        notify_order_listeners(
+            "item_qty_changed", self, item_id=line.id, qty=line.qty
+        )
+        order_instances.persist(self)
+
+    def _reserve_items(self) -> None:
+        """Reserves stock of all the order items or none, unless the order is closed"""
+
+        if self.items and self.reserves_stock:
+            stock_reservations.reserve(
+                self.id, [(item.product, item.qty) for item in self.items]
+            )
+
+    def add_items(self, items: list[OrderItem], merge: bool = False) -> None:
+        """
+        Adds items in order reserving the stock of all of them or none.
+        In the `merge` mode the items are merged into the order lines of the
+        same product and price as `add_item` does, including the lines added
+        by the preceding items.
+        """
+
+        stock_reservations.reserve(
+            self.id, [(item.product, item.qty) for item in items]
+        )
+        added, merged = [], {}
+        for item in items:
+            line = (
+                self.items.get_line(item.product.id, item.item_price) if merge else None
+            )
+            if line is None:
+                self.items.add(item)
+                added.append(item)
+            else:  # the reserved stock covers the merged quantity
+                line.qty += item.qty
+                merged[line.id] = line
+
+        if added or not merged:
+            notify_order_listeners("items_added", self, items=added)
+        for line in merged.values():
+            notify_order_listeners(
+                "item_qty_changed", self, item_id=line.id, qty=line.qty
+            )
+        order_instances.persist(self)
 
     def remove_item(self, item_id: str) -> None:
-        """Removes an item from the order"""
+        """Removes an item from the order and releases its product stock"""
 
-        self.items = list(filter(lambda x: x.id != item_id, self.items))
+        item = self.items.remove(item_id)
+        if item is not None:
+            stock_reservations.release(self.id, [(item.product, item.qty)])
+        notify_order_listeners("item_removed", self, item_id=item_id)
+        order_instances.persist(self)
+
+    def update_item_qty(self, item_id: str, qty: float) -> None:
+        """Changes quantity of the order item reserving / releasing its stock"""
+
+        item = self.items.get(item_id)
+        if item is None:
+            raise ItemsDoNotFound
+        if qty < 0:
+            raise ValueError
+
+        if qty > item.qty:
+            stock_reservations.reserve(self.id, [(item.product, qty - item.qty)])
+        else:
+            stock_reservations.release(self.id, [(item.product, item.qty - qty)])
+        item.qty = qty
+        notify_order_listeners("item_qty_changed", self, item_id=item_id, qty=qty)
+        order_instances.persist(self)
 
     def order_total(self) -> float:
         """Returns sum of items total amount"""
 
-        return sum([item.item_total for item in self.items])
+        if metrics.enabled:
+            with metrics.timer("order_total_seconds"):
+                return self.items.total
+        return self.items.total
 
     def _cancel_order(self) -> None:
         """Cancels the order"""
 
-        self._order_delivery_status = OrderDeliveryStatuses.CANCELED.value
+        stock_reservations.release(self.id)
+        self._set_delivery_status(OrderDeliveryStatuses.CANCELED.value)
 
         if self._order_payment_status == OrderPaymentStatus.PAID.value:
-            self._order_payment_status = OrderPaymentStatus.REFUNDED.value
+            self._set_payment_status(OrderPaymentStatus.REFUNDED.value)
         else:
-            self._order_payment_status = OrderPaymentStatus.CANCELED.value
+            self._set_payment_status(OrderPaymentStatus.CANCELED.value)
+        notify_order_listeners("cancelled", self)
 
     @staticmethod
     def get_customer_orders(customer_id: str) -> list:
+        return order_instances.filter_by("customer.id", customer_id)
+
+    @staticmethod
+    def get_employee_orders(employee_id: str) -> list:
+        return order_instances.filter_by("employee.id", employee_id)
+
+    @staticmethod
+    def get_orders_by_status(
+        delivery_status: Optional[int] = None,
+        payment_status: Optional[int] = None,
+        exclude_delivery_status: Optional[int] = None,
+        exclude_payment_status: Optional[int] = None,
+    ) -> list:
+        """
+        Returns orders having the given statuses and not having the excluded ones,
+        e.g. all paid but not delivered orders. Answered from the status indexes.
+        """
+
+        where = {"delivery_status": delivery_status, "payment_status": payment_status}
+        exclude = {
+            "delivery_status": exclude_delivery_status,
+            "payment_status": exclude_payment_status,
+        }
+        return order_instances.select(
+            {index: key for index, key in where.items() if key is not None},
+            exclude={index: key for index, key in exclude.items() if key is not None},
+        )
+
+    @staticmethod
+    def iter_customer_orders(
+        customer_id: str, offset: int = 0, limit: Optional[int] = None
+    ) -> Iterator:
+        """Lazily iterates customer orders in creation order"""
+
+        return OrderMixin._paginate(
+            order_instances.iter_by("customer.id", customer_id), offset, limit
+        )
+
+    @staticmethod
+    def iter_employee_orders(
+        employee_id: str, offset: int = 0, limit: Optional[int] = None
+    ) -> Iterator:
+        """Lazily iterates employee orders in creation order"""
+
+        return OrderMixin._paginate(
+            order_instances.iter_by("employee.id", employee_id), offset, limit
+        )
+
+    @staticmethod
+    def get_customer_orders_page(customer_id: str, page: int, page_size: int) -> list:
+        """Returns a single page (starting from 1) of customer orders"""
+
         return list(
-            filter(
-                lambda x: x.customer.id == customer_id, order_instances.get_instances()
+            OrderMixin.iter_customer_orders(
+                customer_id, (page - 1) * page_size, page_size
             )
         )
 
     @staticmethod
-    def get_employee_orders(employee_id: str) -> list:
+    def get_employee_orders_page(employee_id: str, page: int, page_size: int) -> list:
+        """Returns a single page (starting from 1) of employee orders"""
+
         return list(
-            filter(
-                lambda x: x.employee.id == employee_id, order_instances.get_instances()
+            OrderMixin.iter_employee_orders(
+                employee_id, (page - 1) * page_size, page_size
             )
         )
 
+    @staticmethod
+    def _paginate(orders: Iterator, offset: int, limit: Optional[int]) -> Iterator:
+        stop = None if limit is None else offset + limit
+        return islice(orders, offset, stop)
+
+    @classmethod
+    def bulk_create(cls, rows: Iterable[dict[str, Any]]) -> BulkCreateResult:
+        """
+        Creates orders from the given rows of `Order` arguments.
+        The whole batch is validated at once and the valid orders are registered
+        together, invalid rows (including the rows whose items can't be reserved)
+        are reported by their index instead of raising.
+        """
+
+        result = BulkCreateResult()
+        delivery_statuses = OrderDeliveryStatuses.value_set()
+        payment_statuses = OrderPaymentStatus.value_set()
+
+        for index, row in enumerate(rows):
+            try:
+                with deferred_registration():
+                    order = cls(**row)
+
+                if order.delivery_status not in delivery_statuses:
+                    raise StatusDoesNotExists
+                if order.payment_status not in payment_statuses:
+                    raise StatusDoesNotExists
+
+                if not order.customer.is_address_valid(order.customer_address):
+                    raise InvalidCustomerAddress
+
+                order._reserve_items()
+            except Exception as e:
+                result.errors[index] = e
+            else:
+                result.orders.append(order)
+
+        try:
+            order_instances.set_instances(result.orders)
+        except Exception:
+            for order in result.orders:
+                stock_reservations.release(order.id)
+            raise
+        for order in result.orders:
+            notify_order_listeners("created", order)
+        return result
+
+    @timed_construction
     def __post_init__(self):
+        if not isinstance(self.items, OrderItemMap):
+            self.items = OrderItemMap(self.items)
+        if registration_deferred():
+            super().__post_init__()
+            return
+
         self.validate_order_delivery_status(self.delivery_status)
         self.validate_order_pyment_status(self.payment_status)
         self.validate_customer_address(self.customer, self.customer_address)
-        super().__post_init__()
+        with deferred_registration():
+            super().__post_init__()  # assigns the id the items are reserved by
+
+        self._reserve_items()
+        try:
+            register_instance(self)
+        except Exception:
+            stock_reservations.release(self.id)
+            raise
+        notify_order_listeners("created", self)
 
     def rate_employee(self, rating: EmployeeRating) -> None:
         if (
@@ -194,5 +716,24 @@ class Order(BaseModel):
             raise RateError
 
         self.employee.rating = rating
+        notify_order_listeners("employee_rated", self, rating=rating)
+
+        logger.info(
+            "Thank you for the review",
+            extra={"order_id": self.id, "employee_id": self.employee.id},
+        )
 
-        logger.info("Thank you for the review")
+
+@dataclass
+class Order(OrderMixin, BaseModel):
+    customer: Customer
+    customer_address: CustomerAddress
+    employee: Employee
+    employee_rating: Optional[EmployeeRating] = None
+    items: OrderItemMap = field(default_factory=OrderItemMap)  # by item id
+    _order_delivery_status: int = (
+        OrderDeliveryStatuses.WAITING.value
+    )  # OrderDeliveryStatuses
+    _order_payment_status: int = OrderPaymentStatus.WAITING.value  # OrderPaymentStatus
+    _ordered: bool = False
+    __management_instance = order_instances
@@ -1,20 +1,29 @@
-from dataclasses import dataclass
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
 
 from .exceptions import StockQuantityIsNotEnough, DiscountError
-from .helpers import BaseModel
+from .helpers import BaseModel, timed_construction
 from src.management import InstanceManagement
+from src.stock import stock_reservations
 
-product_instances = InstanceManagement([])
+product_instances = InstanceManagement(
+    [], unique_indexes=("sku",), concurrent=True, name="products"
+)
 
 
-@dataclass
-class Product(BaseModel):
-    product_name: str
-    price: float
-    discount: float  # by percents
-    stock_qty: float
-    __sku: str = ''
-    __management_instance = product_instances
+class ProductMixin:
+    """Behaviour of the products shared by `Product` and its compact variant"""
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        if name in ("price", "discount"):
+            if name == "discount":
+                self.validate_discount(value)
+            object.__setattr__(self, "_final_price", None)
+        object.__setattr__(self, name, value)
 
     @staticmethod
     def validate_discount(discount):
@@ -25,49 +34,114 @@ class Product(BaseModel):
 
     @property
     def sku(self):
-        return self.__sku
+        return self._sku
 
+    @timed_construction
     def __post_init__(self):
-        self.validate_discount(self.discount)
-        self.__slugify_product()
-        super().__post_init__()
+        self._sku = product_skus.reserve(self.product_name)
+        try:
+            super().__post_init__()
+        finally:
+            product_skus.release(self._sku)
+
+    @property
+    def final_price(self) -> float:
+        """Returns final cost of the product, cached until price or discount change"""
+
+        if self._final_price is None:
+            self._final_price = self.price - (self.price * self.discount / 100)
+        return self._final_price
+
+    @staticmethod
+    def reprice(products: list, discount: float) -> None:
+        """
+        Applies the discount to all the products validating it once and setting
+        the final prices directly instead of going through `__setattr__`.
+        """
+
+        ProductMixin.validate_discount(discount)
+        for product in products:
+            final_price = product.price - (product.price * discount / 100)
+            object.__setattr__(product, "discount", discount)
+            object.__setattr__(product, "_final_price", final_price)
+
+    def update_qty(self, sold_qty: float):
+        """Updates stock quantity after selling, the reserved stock can't be sold"""
+        with stock_reservations.lock_for(self):
+            if sold_qty > stock_reservations.available_qty(self):
+                raise StockQuantityIsNotEnough
+
+            self.stock_qty -= sold_qty
+
+
+@dataclass
+class Product(ProductMixin, BaseModel):
+    product_name: str
+    price: float
+    discount: float  # by percents
+    stock_qty: float
+    _sku: str = ''
+    _final_price: Optional[float] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    __management_instance = product_instances
 
     def _validate_product(self):
         """Validates is the product sku unique"""
 
-        if (
-            len(
-                list(
-                    filter(
-                        lambda x: x.sku == self.sku, product_instances.get_instances()
-                    )
-                )
-            )
-            > 0
-        ):
+        if product_instances.exists("sku", self.sku):
             raise ValueError
 
-    @property
-    def final_price(self) -> float:
-        """Calculates final cost of the product"""
 
-        return self.price - (self.price * self.discount / 100)
+_SLUG_SEPARATORS = re.compile(r"[\W_]+")
 
-    def update_qty(self, sold_qty: float):
-        """Updates stock quantity after selling"""
-        if sold_qty > self.stock_qty:
-            raise StockQuantityIsNotEnough
-
-        self.stock_qty -= sold_qty
-
-    def __slugify_product(self):
-        """Generates simple sku for the product"""
-
-        product_name = self.product_name
-        product_name.replace(",", "-")
-        product_name.replace(".", "-")
-        product_name.replace("/", "-")
-        product_name.replace("'", "-")
-        product_name.replace(":", "-")
-        product_name = product_name.split(" ")
-        self.__sku = "-".join(product_name).lower()
+
+def slugify_product_name(product_name: str) -> str:
+    """Generates simple sku from the product name"""
+
+    return _SLUG_SEPARATORS.sub("-", product_name.lower()).strip("-") or "product"
+
+
+class SkuGenerator:
+    """
+    Generates unique SKUs from the product names.
+
+    A taken SKU gets the next free numeric suffix (``product``, ``product-2``,
+    ...). The taken SKUs are looked up in the SKU index of the registry and the
+    last suffix of every slug is remembered, so resolving a collision costs
+    O(1) lookups. The SKUs are reserved until their products are registered,
+    so concurrently created products never get the same SKU.
+    """
+
+    def __init__(self, registry: InstanceManagement):
+        self.registry = registry
+        self._lock = threading.Lock()
+        self._suffixes: dict[str, int] = {}  # last used suffix by slug
+        self._reserved: set[str] = set()
+
+    def reserve(self, product_name: str) -> str:
+        slug = slugify_product_name(product_name)
+        with self._lock:
+            sku = slug
+            if self._taken(sku):
+                suffix = self._suffixes.get(slug, 1)
+                if suffix > 1 and not self._taken(f"{slug}-{suffix}"):
+                    suffix = 1  # the products have been removed since
+                while self._taken(sku):
+                    suffix += 1
+                    sku = f"{slug}-{suffix}"
+                self._suffixes[slug] = suffix
+            self._reserved.add(sku)
+        return sku
+
+    def release(self, sku: str) -> None:
+        """Releases the reservation once the product is registered (or failed)"""
+
+        with self._lock:
+            self._reserved.discard(sku)
+
+    def _taken(self, sku: str) -> bool:
+        return sku in self._reserved or self.registry.exists("sku", sku)
+
+
+product_skus = SkuGenerator(product_instances)
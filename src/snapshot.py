@@ -0,0 +1,76 @@
+"""
+Binary snapshots of all the named `InstanceManagement` registries.
+
+A snapshot is a single file with one pickle frame per registry written by the
+same pickler, so objects referenced from several registries (e.g. a `Customer`
+of an `Order`) are stored once and restored as the very same object. Stock
+reservations are not stored, they are rebuilt from the restored orders.
+
+The registry frames are preceded by a metadata frame, e.g. the sequence number
+of the last order journal entry the snapshot already contains.
+"""
+import mmap
+import os
+import pickle
+from typing import Iterable, Optional
+
+from src.management import registries
+from src.order import order_instances, rebuild_stock_reservations
+
+SNAPSHOT_HEADER = b"ORDER-MANAGEMENT-SNAPSHOT:2\n"
+
+
+def save_snapshot(
+    path: str, names: Optional[Iterable[str]] = None, journal_sequence: int = 0
+) -> None:
+    """Dumps the registries (all named ones by default) into the snapshot file"""
+
+    names = list(registries) if names is None else list(names)
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as file:
+        file.write(SNAPSHOT_HEADER)
+        pickler = pickle.Pickler(file, protocol=pickle.HIGHEST_PROTOCOL)
+        pickler.dump({"journal_sequence": journal_sequence})
+        for name in names:
+            pickler.dump((name, registries[name].get_instances()))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary_path, path)
+
+
+def load_snapshot(path: str) -> dict[str, int]:
+    """
+    Restores the registries from the snapshot file streaming it registry by
+    registry from a memory map. Returns number of restored instances by name.
+    """
+
+    restored = {}
+    with open(path, "rb") as file, mmap.mmap(
+        file.fileno(), 0, access=mmap.ACCESS_READ
+    ) as snapshot:
+        unpickler = _open(path, snapshot)
+        unpickler.load()  # metadata
+        while True:
+            try:
+                name, instances = unpickler.load()
+            except EOFError:
+                break
+            registries[name].restore(instances)
+            restored[name] = len(instances)
+
+    if order_instances.name in restored:
+        rebuild_stock_reservations()
+    return restored
+
+
+def snapshot_metadata(path: str) -> dict:
+    """Returns the metadata of the snapshot file without restoring it"""
+
+    with open(path, "rb") as file:
+        return _open(path, file).load()
+
+
+def _open(path: str, file) -> pickle.Unpickler:
+    if file.read(len(SNAPSHOT_HEADER)) != SNAPSHOT_HEADER:
+        raise ValueError(f"{path} is not a snapshot file")
+    return pickle.Unpickler(file)
@@ -0,0 +1,149 @@
+import threading
+from contextlib import ExitStack
+from typing import Iterable, Optional
+
+from src.exceptions import StockQuantityIsNotEnough
+
+
+class StockReservationEngine:
+    """
+    Reserves product stock for orders.
+
+    Every product has its own lock, so reservations of unrelated products
+    don't contend. Multi-product reservations take the product locks in a
+    stable order (by product id) to stay deadlock free, and are applied
+    all-or-nothing.
+    """
+
+    def __init__(self):
+        self._locks: dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._reserved: dict[str, float] = {}  # by product id
+        self._reservations: dict[str, dict[str, list]] = {}  # by order id
+
+    def lock_for(self, product) -> threading.Lock:
+        """Returns the lock guarding the given product stock"""
+
+        lock = self._locks.get(product.id)
+        if lock is None:
+            with self._locks_guard:
+                lock = self._locks.setdefault(product.id, threading.Lock())
+        return lock
+
+    def reserved_qty(self, product) -> float:
+        return self._reserved.get(product.id, 0)
+
+    def available_qty(self, product) -> float:
+        return product.stock_qty - self.reserved_qty(product)
+
+    def reserve(self, order_id: str, items: Iterable[tuple]) -> None:
+        """
+        Reserves (product, qty) pairs for the order.
+        Raises `StockQuantityIsNotEnough` without reserving anything if any of
+        the products does not have enough available stock.
+        """
+
+        quantities = self._group(items)
+        with self._locked(quantities):
+            for product, qty in quantities.values():
+                if qty > self.available_qty(product):
+                    raise StockQuantityIsNotEnough
+
+            reservation = self._reservations.setdefault(order_id, {})
+            for product_id, (product, qty) in quantities.items():
+                self._reserved[product_id] = self.reserved_qty(product) + qty
+                reservation.setdefault(product_id, [product, 0])[1] += qty
+
+    def release(self, order_id: str, items: Optional[Iterable[tuple]] = None) -> None:
+        """Releases the given (product, qty) pairs, or the whole order reservation"""
+
+        if items is None:
+            reservation, locked = self._locked_reservation(order_id)
+            with locked:
+                if reservation is not None:
+                    del self._reservations[order_id]
+                    for product_id, (product, qty) in reservation.items():
+                        self._reserved[product_id] = self.reserved_qty(product) - qty
+            return
+
+        reservation = self._reservations.get(order_id)
+        if not reservation:
+            return
+
+        quantities = self._group(items)
+        with self._locked(quantities):
+            for product_id, (product, qty) in quantities.items():
+                reserved = reservation.get(product_id)
+                if reserved is None:
+                    continue
+                qty = min(qty, reserved[1])
+                reserved[1] -= qty
+                if not reserved[1]:
+                    reservation.pop(product_id, None)
+                self._reserved[product_id] = self.reserved_qty(product) - qty
+
+    def consume(self, order_id: str) -> None:
+        """
+        Consumes the whole order reservation (once the order is delivered),
+        the reserved quantities are taken off the products stock.
+        """
+
+        reservation, locked = self._locked_reservation(order_id)
+        with locked:
+            if reservation is None:
+                return
+            del self._reservations[order_id]
+            for product_id, (product, qty) in reservation.items():
+                product.stock_qty -= qty
+                self._reserved[product_id] = self.reserved_qty(product) - qty
+
+    def clear(self) -> None:
+        """Drops all the reservations (e.g. before rebuilding them from orders)"""
+
+        with self._locks_guard:
+            self._reserved = {}
+            self._reservations = {}
+
+    def order_reservation(self, order_id: str) -> dict[str, float]:
+        """Returns reserved quantities of the order by product id"""
+
+        return {
+            product_id: qty
+            for product_id, (_, qty) in self._reservations.get(order_id, {}).items()
+        }
+
+    @staticmethod
+    def _group(items: Iterable[tuple]) -> dict[str, list]:
+        quantities: dict[str, list] = {}
+        for product, qty in items:
+            quantities.setdefault(product.id, [product, 0])[1] += qty
+        return quantities
+
+    def _locked_reservation(self, order_id: str) -> tuple[Optional[dict], ExitStack]:
+        """
+        Returns the order reservation (None if there is none) with the locks of
+        all its products taken, so it is only dropped under the locks guarding
+        the reserved quantities.
+        """
+
+        while True:
+            reservation = self._reservations.get(order_id)
+            if not reservation:
+                return None, ExitStack()
+            products = dict(reservation)
+            locked = self._locked(products)
+            if (
+                self._reservations.get(order_id) is reservation
+                and reservation.keys() == products.keys()
+            ):
+                return reservation, locked
+            locked.close()  # changed before the locks were taken
+
+    def _locked(self, quantities: dict[str, list]) -> ExitStack:
+        stack = ExitStack()
+        for product_id in sorted(quantities):
+            stack.enter_context(self.lock_for(quantities[product_id][0]))
+        return stack
+
+
+stock_reservations = StockReservationEngine()
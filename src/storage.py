@@ -0,0 +1,215 @@
+import io
+import pickle
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from typing import Iterable, Iterator, Optional
+
+from src.management import get_management_instance, registries
+
+
+class StorageBackend(ABC):
+    """
+    Persistent storage of `InstanceManagement` registries.
+
+    Instances are stored as (id, data) rows where data is produced by `dumps`.
+    References to instances of other named registries are stored by id and
+    resolved through the registries when loaded, so the object identity of
+    cross references is preserved.
+
+    The data is a pickle blob and unpickling runs code chosen by whoever
+    wrote it, so only load storage from trusted sources.
+    """
+
+    @abstractmethod
+    def register(self, registry) -> None:
+        ...
+
+    @abstractmethod
+    def save(self, registry, instance) -> None:
+        ...
+
+    @abstractmethod
+    def exists(self, registry, index: str, key) -> bool:
+        ...
+
+    @abstractmethod
+    def keys(self, registry, index: str) -> Iterable:
+        """Returns all the stored keys of the index"""
+
+    @abstractmethod
+    def rows(self, registry, index: Optional[str] = None, key=None) -> Iterator:
+        ...
+
+    @abstractmethod
+    def clear(self, registry) -> None:
+        ...
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.flush()
+
+    @staticmethod
+    def dumps(instance) -> bytes:
+        buffer = io.BytesIO()
+        _ReferencePickler(buffer, instance).dump(instance)
+        return buffer.getvalue()
+
+    @staticmethod
+    def loads(data: bytes):
+        return _ReferenceUnpickler(io.BytesIO(data)).load()
+
+
+class _ReferencePickler(pickle.Pickler):
+    """Pickles instances of named registries (except the root) as references"""
+
+    def __init__(self, file, root):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.root = root
+
+    def persistent_id(self, obj):
+        if obj is self.root or isinstance(obj, type):
+            return None
+        registry = get_management_instance(type(obj))
+        if registry is None or registry.name is None:
+            return None
+        return registry.name, obj.id
+
+
+class _ReferenceUnpickler(pickle.Unpickler):
+    def persistent_load(self, pid):
+        registry_name, instance_id = pid
+        return registries[registry_name].get_by("id", instance_id)
+
+
+def _column(index: str) -> str:
+    return index.replace(".", "_")
+
+
+class SQLiteBackend(StorageBackend):
+    """
+    SQLite storage with a table per registry and an indexed column per
+    registry index.
+
+    Saves are written behind: they are buffered and written in a single
+    transaction once `batch_size` instances are pending, or on `flush`.
+    """
+
+    def __init__(self, path: str = ":memory:", batch_size: int = 500):
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.batch_size = batch_size
+        self._lock = threading.RLock()
+        self._statements: dict[str, str] = {}
+        self._keys: dict[str, list] = {}
+        self._pending: dict[str, dict[str, object]] = {}
+        self._pending_count = 0
+
+    def register(self, registry) -> None:
+        table = registry.name
+        columns = [_column(index) for index in registry.index_keys if index != "id"]
+        with self._lock, self.connection:
+            self.connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} "
+                f"(id TEXT PRIMARY KEY, data BLOB NOT NULL"
+                f"{''.join(f', {column}' for column in columns)})"
+            )
+            for column in columns:
+                self.connection.execute(
+                    f"CREATE INDEX IF NOT EXISTS {table}_{column} ON {table} ({column})"
+                )
+
+        names = ["id", "data", *columns]
+        updates = ", ".join(f"{name} = excluded.{name}" for name in names[1:])
+        self._statements[table] = (
+            f"INSERT INTO {table} ({', '.join(names)}) "
+            f"VALUES ({', '.join('?' * len(names))}) "
+            f"ON CONFLICT(id) DO UPDATE SET {updates}"
+        )
+        self._keys[table] = [
+            key for index, key in registry.index_keys.items() if index != "id"
+        ]
+        self._pending.setdefault(table, {})
+
+    def save(self, registry, instance) -> None:
+        with self._lock:
+            pending = self._pending[registry.name]
+            if instance.id not in pending:
+                pending[instance.id] = instance
+                self._pending_count += 1
+            if self._pending_count >= self.batch_size:
+                self.flush()
+
+    def flush(self) -> None:
+        """Writes all pending saves in a single transaction"""
+
+        with self._lock:
+            if not self._pending_count:
+                return
+            with self.connection:
+                for table, pending in self._pending.items():
+                    if not pending:
+                        continue
+                    self.connection.executemany(
+                        self._statements[table],
+                        [self._row(table, instance) for instance in pending.values()],
+                    )
+                    pending.clear()
+            self._pending_count = 0
+
+    def exists(self, registry, index: str, key) -> bool:
+        # pending instances are still held in memory by their registries
+        with self._lock:
+            cursor = self.connection.execute(
+                f"SELECT 1 FROM {registry.name} WHERE {_column(index)} = ? LIMIT 1",
+                (key,),
+            )
+            return cursor.fetchone() is not None
+
+    def keys(self, registry, index: str) -> Iterable:
+        # pending instances are held in memory and indexed by their registries
+        with self._lock:
+            cursor = self.connection.execute(
+                f"SELECT DISTINCT {_column(index)} FROM {registry.name}"
+            )
+            return [key for key, in cursor]
+
+    def rows(self, registry, index: Optional[str] = None, key=None) -> Iterator:
+        """Returns stored (id, data) rows, filtered by the index key if given"""
+
+        query = f"SELECT id, data FROM {registry.name}"
+        parameters = ()
+        if index is not None:
+            query += f" WHERE {_column(index)} = ?"
+            parameters = (key,)
+        with self._lock:
+            return self.connection.execute(
+                f"{query} ORDER BY rowid", parameters
+            ).fetchall()
+
+    def clear(self, registry) -> None:
+        with self._lock:
+            self._pending_count -= len(self._pending[registry.name])
+            self._pending[registry.name].clear()
+            with self.connection:
+                self.connection.execute(f"DELETE FROM {registry.name}")
+
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            self.connection.close()
+
+    def _row(self, table: str, instance) -> tuple:
+        return (
+            instance.id,
+            self.dumps(instance),
+            *(key(instance) for key in self._keys[table]),
+        )
+
+
+def attach_storage(backend: StorageBackend) -> None:
+    """Persists all the named registries in the given storage backend"""
+
+    for registry in registries.values():
+        registry.attach_backend(backend)
@@ -0,0 +1,118 @@
+"""
+Declarative state machines of the order delivery and payment statuses.
+
+The rules are compiled once into a lookup table keyed by
+``(paid, source, target)``, so checking a transition is a single dict lookup.
+"""
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Callable, Iterable, Optional
+
+from src.constants import OrderDeliveryStatuses, OrderPaymentStatus
+from src.exceptions import OrderAlreadyHasBeenPaid, StatusDoesNotExists
+
+
+@dataclass
+class Transition:
+    source: int
+    target: int
+    cancels: bool  # the transition cancels the order
+    hooks: list[Callable] = field(default_factory=list)
+
+    @property
+    def repeated(self) -> bool:
+        return self.source == self.target
+
+
+class StateMachine:
+    """
+    Transitions of an order status.
+
+    ``transitions`` maps a source status to the statuses it may move to, the
+    ``None`` source matches every status. Once the order is paid only the
+    ``paid_targets`` are reachable. Moving to ``cancel_status`` cancels the order.
+    """
+
+    def __init__(
+        self,
+        statuses: type[Enum],
+        cancel_status: Enum,
+        paid_targets: Iterable[Enum],
+        transitions: Optional[dict[Optional[Enum], Iterable[Enum]]] = None,
+    ):
+        self.statuses = statuses
+        if transitions is None:
+            transitions = {None: list(statuses)}
+        paid = {status.value for status in paid_targets}
+
+        self.table: dict[tuple[bool, int, int], Transition] = {}
+        for source, targets in transitions.items():
+            sources = statuses if source is None else [source]
+            for source_status in sources:
+                for target in targets:
+                    transition = Transition(
+                        source_status.value,
+                        target.value,
+                        cancels=target == cancel_status,
+                    )
+                    self.table[False, source_status.value, target.value] = transition
+                    if target.value in paid:
+                        self.table[True, source_status.value, target.value] = transition
+
+    def resolve(self, paid: bool, source: int, target: int) -> Transition:
+        """
+        Returns the transition of the `source` status to the `target` one.
+        Raises `StatusDoesNotExists` for unknown statuses and
+        `OrderAlreadyHasBeenPaid` for transitions forbidden for the paid order.
+        """
+
+        transition = self.table.get((paid, source, target))
+        if transition is None:
+            if target not in self.statuses.value_set():
+                raise StatusDoesNotExists
+            raise OrderAlreadyHasBeenPaid
+        return transition
+
+    def on_transition(
+        self,
+        hook: Callable,
+        source: Optional[Enum] = None,
+        target: Optional[Enum] = None,
+    ) -> None:
+        """
+        Calls `hook(order, transition)` after every matching transition,
+        `None` source or target matches every status.
+        """
+
+        for transition in {id(t): t for t in self.table.values()}.values():
+            if source is not None and transition.source != source.value:
+                continue
+            if target is not None and transition.target != target.value:
+                continue
+            transition.hooks.append(hook)
+
+    def remove_hook(self, hook: Callable) -> None:
+        for transition in self.table.values():
+            if hook in transition.hooks:
+                transition.hooks.remove(hook)
+
+    @staticmethod
+    def run_hooks(order, transition: Transition) -> None:
+        for hook in transition.hooks:
+            hook(order, transition)
+
+
+delivery_state_machine = StateMachine(
+    OrderDeliveryStatuses,
+    cancel_status=OrderDeliveryStatuses.CANCELED,
+    paid_targets=(
+        OrderDeliveryStatuses.CANCELED,
+        OrderDeliveryStatuses.DELIVERED,
+        OrderDeliveryStatuses.RETURNED,
+    ),
+)
+payment_state_machine = StateMachine(
+    OrderPaymentStatus,
+    cancel_status=OrderPaymentStatus.CANCELED,
+    paid_targets=(OrderPaymentStatus.CANCELED, OrderPaymentStatus.REFUNDED),
+)
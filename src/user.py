@@ -1,8 +1,14 @@
 from dataclasses import dataclass
-from src.helpers import BaseModel
+from src.helpers import BaseModel, timed_construction
 from src.management import InstanceManagement
 
-user_instances = InstanceManagement([])
+user_instances = InstanceManagement(
+    [],
+    unique_indexes=("username",),
+    indexes=("email",),
+    concurrent=True,
+    name="users",
+)
 
 
 @dataclass
@@ -15,7 +21,7 @@ class User(BaseModel):
     __management_instance = user_instances
 
     def _validate_user(self) -> bool:
-        if len(list(filter(lambda x: x.username == self.username, user_instances.get_instances()))) > 0:
+        if user_instances.exists("username", self.username):
             raise ValueError
 
         return True
@@ -28,6 +34,7 @@ class User(BaseModel):
     def username(self, value):
         self.__username = value
 
+    @timed_construction
     def __post_init__(self):
         self.username = self.email.split("@")[-1]
         super().__post_init__()
@@ -0,0 +1,70 @@
+from importlib.util import find_spec
+from types import SimpleNamespace
+from unittest import TestCase, skipUnless
+
+from src.columnar import OrderItemColumns
+
+
+def make_order(order_id, customer_id, items):
+    return SimpleNamespace(
+        id=order_id,
+        customer=SimpleNamespace(id=customer_id),
+        items=[
+            SimpleNamespace(
+                product=SimpleNamespace(id=product_id), qty=qty, item_price=price
+            )
+            for product_id, qty, price in items
+        ],
+    )
+
+
+@skipUnless(find_spec("numpy") is not None, "NumPy is not installed")
+class TestOrderItemColumns(TestCase):
+    def setUp(self):
+        self.orders = [
+            make_order(
+                "order-1", "customer-1", [("product-1", 2, 10), ("product-2", 1, 5)]
+            ),
+            make_order("order-2", "customer-2", [("product-1", 3, 10)]),
+            make_order("order-3", "customer-1", [("product-2", 4, 5)]),
+        ]
+        self.columns = OrderItemColumns(capacity=2)
+        for order in self.orders:
+            self.columns.add_order(order)
+
+    def test_order_total(self):
+        assert self.columns.order_total("order-1") == 25
+        assert self.columns.order_total("unknown") == 0
+
+    def test_order_total_after_adding_items(self):
+        assert self.columns.order_total("order-2") == 30
+
+        (item,) = make_order("order-2", "customer-2", [("product-3", 1, 7)]).items
+        self.columns.add_item(self.orders[1], item)
+        self.columns.add_order(
+            make_order("order-4", "customer-3", [("product-1", 1, 10)])
+        )
+
+        assert self.columns.order_total("order-2") == 37
+        assert self.columns.order_total("order-3") == 20
+        assert self.columns.order_total("order-4") == 10
+
+    def test_grouped_totals(self):
+        assert self.columns.totals_by_order() == {
+            "order-1": 25,
+            "order-2": 30,
+            "order-3": 20,
+        }
+        assert self.columns.totals_by_product() == {"product-1": 50, "product-2": 25}
+        assert self.columns.totals_by_customer() == {
+            "customer-1": 45,
+            "customer-2": 30,
+        }
+
+    def test_zero_capacity(self):
+        columns = OrderItemColumns(capacity=0)
+        for order in self.orders:
+            columns.add_order(order)
+
+        assert columns.totals_by_order() == self.columns.totals_by_order()
+        assert columns.totals_by_customer() == self.columns.totals_by_customer()
@@ -0,0 +1,81 @@
+import uuid
+from unittest import TestCase
+
+from src.compact import CompactOrder, CompactOrderItem, CompactProduct
+from src.constants import OrderPaymentStatus
+from src.customer import Customer, CustomerAddress, customer_instances
+from src.employee import Employee, EmployeeDepartment, employee_instances
+from src.exceptions import ObjectAlreadyExists, StockQuantityIsNotEnough
+from src.order import Order, order_instances
+from src.product import product_instances
+from src.user import User, user_instances
+
+
+class TestCompactModels(TestCase):
+    def setUp(self):
+        self.product = CompactProduct(
+            product_name="Compact product", price=200, discount=10, stock_qty=10
+        )
+
+    def tearDown(self):
+        product_instances.set_empty_instances()
+        order_instances.set_empty_instances()
+        customer_instances.set_empty_instances()
+        employee_instances.set_empty_instances()
+        user_instances.set_empty_instances()
+
+    def test_compact_product(self):
+        assert not hasattr(self.product, "__dict__")
+        assert uuid.UUID(self.product.id).int == self.product._uid
+        assert product_instances.get_by("id", self.product.id) is self.product
+        assert self.product.sku == "compact-product"
+        assert self.product.final_price == 180
+
+        try:
+            CompactProduct(
+                product_name="Compact product", price=200, discount=10, stock_qty=10
+            )
+        except Exception as e:
+            assert isinstance(e, ObjectAlreadyExists)
+
+    def test_compact_order_item(self):
+        item = CompactOrderItem(product=self.product, qty=3, item_price=180)
+        assert not hasattr(item, "__dict__")
+        assert item.item_total == 540
+
+        try:
+            CompactOrderItem(product=self.product, qty=11, item_price=180)
+        except Exception as e:
+            assert isinstance(e, StockQuantityIsNotEnough)
+
+    def test_compact_order(self):
+        user = User(
+            first_name="Gvido",
+            last_name="Van Rosom",
+            email="gvido@compact.org",
+            phone_number="+374747474",
+        )
+        address = CustomerAddress(address="Armenia, Yerevan")
+        customer = Customer(user=user, addresses=[address])
+        employee_user = User(
+            first_name="Gvido",
+            last_name="Van Rosom",
+            email="gvido@compact-employee.org",
+            phone_number="+374747474",
+        )
+        employee = Employee(
+            user=employee_user,
+            department=EmployeeDepartment("Compact delivery"),
+            salary=1000,
+            num_absent=0,
+            absense_cost=0,
+        )
+
+        order = CompactOrder(customer, customer_address=address, employee=employee)
+        assert not hasattr(order, "__dict__")
+        order.add_item(CompactOrderItem(product=self.product, qty=2, item_price=180))
+        order.change_order_payment_status(OrderPaymentStatus.PAID.value)
+
+        assert order.ordered
+        assert order.order_total() == 360
+        assert Order.get_customer_orders(customer.id) == [order]
@@ -1,4 +1,4 @@
-from unittest import TestCase
+from unittest import IsolatedAsyncioTestCase, TestCase
 
 from src import exceptions
 from src.customer import (
@@ -10,6 +10,7 @@ from src.customer import (
 from src.exceptions import ObjectAlreadyExists
 from src.user import User, user_instances
 from src.constants import CustomerAddressActions
+from src.mail import mail_outbox, StubTransport
 
 
 class TestCustomer(TestCase):
@@ -64,6 +65,36 @@ class TestCustomer(TestCase):
         customer.request_verification_code()
         assert verification_code != customer.verification_code
 
+    def test_verification_code_is_emailed(self):
+        transport = StubTransport()
+        mail_outbox.flush(timeout=5)
+        mail_outbox.set_transport(transport)
+        user = User(**{**self.user_fixture, "email": "gvido@verification.org"})
+        customer = Customer(user=user)
+        mail_outbox.flush(timeout=5)
+
+        assert transport.sent == [(customer.verification_code, [user.email])]
+
+
+class TestAsyncCustomer(IsolatedAsyncioTestCase):
+    user_fixture = {
+        "first_name": "Gvido",
+        "last_name": "Van Rosom",
+        "email": "gvido@asyncio.org",
+        "phone_number": "+374747474",
+    }
+
+    async def test_acreate_inside_running_loop(self):
+        transport = StubTransport()
+        mail_outbox.flush(timeout=5)
+        mail_outbox.set_transport(transport)
+        user = User(**self.user_fixture)
+        customer = await Customer.acreate(user=user)
+
+        assert customer.verification_code
+        await customer.arequest_verification_code()
+        assert transport.sent[-1] == (customer.verification_code, [user.email])
+
 
 class TestCustomerAddress(TestCase):
     def test_create_customer_address(self):
@@ -86,3 +117,47 @@ class TestCustomerAddress(TestCase):
             action=CustomerAddressActions.REMOVE.value, data=addresses[0].id
         )
         assert len(customer.addresses) == 0
+
+    def test_handle_addresses_in_batch(self):
+        user = User("Gvido", "Van Rosom", "+374747474", "gvido@address-book.org")
+        customer = Customer(user=user)
+        home = CustomerAddress("Armenia, Yerevan")
+
+        customer.handle_address(
+            action=CustomerAddressActions.ADD.value,
+            data=[home, "Armenia, Gyumri", "Armenia, Dilijan"],
+        )
+        assert len(customer.addresses) == 3
+        assert customer.addresses[0] is home
+        assert customer.is_address_valid(home)
+        assert not customer.is_address_valid(CustomerAddress("Armenia, Yerevan"))
+
+        removed = [home.id, customer.addresses[1].id]
+        customer.handle_address(
+            action=CustomerAddressActions.REMOVE.value, data=removed
+        )
+        assert [address.address for address in customer.addresses] == [
+            "Armenia, Dilijan"
+        ]
+        assert not customer.is_address_valid(home)
+
+    def test_addresses_keep_list_interface(self):
+        user = User("Gvido", "Van Rosom", "+374747474", "gvido@address-list.org")
+        home = CustomerAddress("Armenia, Yerevan")
+        customer = Customer(user=user, addresses=[home])
+        office = CustomerAddress("Armenia, Gyumri")
+
+        customer.addresses.append(office)
+        customer.addresses.extend([CustomerAddress("Armenia, Dilijan")])
+        assert customer.addresses[:2] == [home, office]
+        assert customer.addresses[-1].address == "Armenia, Dilijan"
+        assert customer.addresses.index(office) == 1
+
+        customer.addresses.remove(home)
+        assert customer.addresses == [office, customer.addresses[1]]
+        assert customer.addresses.get(office.id) is office
+        assert customer.addresses.index(customer.addresses[1]) == 1
+        try:
+            customer.addresses.remove(home)
+        except Exception as e:
+            assert isinstance(e, ValueError)
@@ -1,4 +1,5 @@
 import random
+from datetime import datetime
 from unittest import TestCase
 
 from src import exceptions
@@ -164,3 +165,45 @@ class TestEmployee(TestCase):
         employee.rating = rating
         assert employee.rating == 1
         assert employee.user_blocked()
+
+    def test_constructor_ratings_block_employee(self):
+        user = user_instances.get_instances()[0]
+        employee_instances.set_empty_instances()
+        department = employee_department_instances.get_instances()[0]
+
+        employee = Employee(
+            absense_cost=0.2,
+            user=user,
+            department=department,
+            num_absent=10,
+            salary=random.choice(self.salaries),
+            _Employee__rating=[EmployeeRating(value=1), EmployeeRating(value=2)],
+        )
+        assert employee.rating == 1.5
+        assert employee.user_blocked()
+
+    def test_rating_aggregates(self):
+        user = user_instances.get_instances()[0]
+        employee_instances.set_empty_instances()
+        department = employee_department_instances.get_instances()[0]
+
+        employee = Employee(
+            absense_cost=0.2,
+            user=user,
+            department=department,
+            num_absent=10,
+            salary=random.choice(self.salaries),
+        )
+        for value in (1, 1, 4):
+            employee.rating = EmployeeRating(
+                value=value, created_at=datetime(2023, 1, 15)
+            )
+        assert employee.user_blocked() is False
+
+        employee.rating = EmployeeRating(value=0.5, created_at=datetime(2023, 2, 1))
+        assert employee.rating == 1.625
+        assert employee.user_blocked()
+        assert employee.monthly_rating(2023, 1) == 2
+        assert employee.monthly_rating(2023, 2) == 0.5
+        assert employee.monthly_rating(2023, 3) is None
+        assert len(employee.ratings) == 4
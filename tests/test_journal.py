@@ -0,0 +1,164 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from src.constants import OrderDeliveryStatuses, OrderPaymentStatus
+from src.customer import Customer, CustomerAddress, customer_instances
+from src.employee import (
+    Employee,
+    EmployeeDepartment,
+    EmployeeRating,
+    employee_department_instances,
+    employee_instances,
+    employee_rating_instances,
+)
+from src.journal import OrderJournal, recover, replay
+from src.order import Order, OrderItem, order_instances
+from src.product import Product, product_instances
+from src.snapshot import save_snapshot
+from src.stock import stock_reservations
+from src.user import User, user_instances
+
+
+class TestOrderJournal(TestCase):
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.journal_path = os.path.join(directory, "orders.journal")
+        self.snapshot_path = os.path.join(directory, "orders.snapshot")
+        self.journal = OrderJournal(
+            self.journal_path, sync_every=1, snapshot_path=self.snapshot_path
+        )
+        self.journal.attach()
+
+        self.address = CustomerAddress(address="Armenia, Yerevan")
+        self.customer = Customer(
+            user=User("Gvido", "Van Rosom", "+374747474", "gvido@journal.org"),
+            addresses=[self.address],
+        )
+        self.employee = Employee(
+            user=User("Gvido", "Van Rosom", "+374747474", "gvido@journal-staff.org"),
+            department=EmployeeDepartment("Journal delivery"),
+            salary=1000,
+            num_absent=0,
+            absense_cost=0,
+        )
+        self.product = Product("Journal product", price=100, discount=0, stock_qty=10)
+
+    def tearDown(self):
+        self.journal.detach()
+        self.journal.close()
+        for path in (self.journal_path, self.snapshot_path):
+            if os.path.exists(path):
+                os.remove(path)
+        for order in order_instances.get_instances():
+            stock_reservations.release(order.id)
+        for registry in (
+            order_instances,
+            product_instances,
+            customer_instances,
+            employee_instances,
+            employee_department_instances,
+            employee_rating_instances,
+            user_instances,
+        ):
+            registry.set_empty_instances()
+
+    def _crash(self):
+        self.journal.detach()
+        self.product.stock_qty = 10  # as of the journal start
+        for order in order_instances.get_instances():
+            stock_reservations.release(order.id)
+        order_instances.set_empty_instances()
+        employee_rating_instances.set_empty_instances()
+
+    def test_replay_rebuilds_orders(self):
+        order = Order(
+            self.customer, customer_address=self.address, employee=self.employee
+        )
+        item = OrderItem(product=self.product, qty=2, item_price=100)
+        order.add_item(item)
+        order.add_item(OrderItem(product=self.product, qty=3, item_price=100))
+        order.remove_item(item.id)
+        order.change_order_payment_status(OrderPaymentStatus.PAID.value)
+        order.change_order_delivery_status(OrderDeliveryStatuses.DELIVERED.value)
+        order.rate_employee(EmployeeRating(value=5, message="Fast"))
+        self._crash()
+
+        assert replay(self.journal_path) == 7
+
+        replayed = order_instances.get_by("id", order.id)
+        assert replayed is not order
+        assert replayed.order_total() == 300
+        assert replayed.ordered
+        assert replayed.delivery_status == OrderDeliveryStatuses.DELIVERED.value
+        assert stock_reservations.reserved_qty(self.product) == 0
+        assert self.product.stock_qty == 7
+        assert Order.get_customer_orders(self.customer.id) == [replayed]
+
+    def test_recover_from_compacted_journal(self):
+        first = Order(
+            self.customer, customer_address=self.address, employee=self.employee
+        )
+        first.add_item(OrderItem(product=self.product, qty=2, item_price=100))
+        self.journal.compact()
+        assert os.path.getsize(self.journal_path) == 0
+
+        second = Order(
+            self.customer, customer_address=self.address, employee=self.employee
+        )
+        second.add_item(OrderItem(product=self.product, qty=1, item_price=100))
+        second.change_order_delivery_status(OrderDeliveryStatuses.CANCELED.value)
+        self._crash()
+
+        assert recover(self.journal_path, self.snapshot_path) == 3
+        assert order_instances.get_by("id", first.id).order_total() == 200
+        cancelled = order_instances.get_by("id", second.id)
+        assert cancelled.payment_status == OrderPaymentStatus.CANCELED.value
+        product = product_instances.get_by("id", self.product.id)
+        assert stock_reservations.reserved_qty(product) == 2
+        assert stock_reservations.order_reservation(first.id) == {product.id: 2}
+
+    def test_recover_after_crash_during_compaction(self):
+        pending = Order(
+            self.customer, customer_address=self.address, employee=self.employee
+        )
+        pending.add_item(OrderItem(product=self.product, qty=2, item_price=100))
+        delivered = Order(
+            self.customer, customer_address=self.address, employee=self.employee
+        )
+        delivered.add_item(OrderItem(product=self.product, qty=3, item_price=100))
+        delivered.change_order_payment_status(OrderPaymentStatus.PAID.value)
+        delivered.change_order_delivery_status(OrderDeliveryStatuses.DELIVERED.value)
+
+        def save_snapshot_and_crash(*args, **kwargs):
+            save_snapshot(*args, **kwargs)
+            raise OSError("crashed before truncating the journal")
+
+        with patch("src.journal.save_snapshot", save_snapshot_and_crash):
+            try:
+                self.journal.compact()
+            except Exception as e:
+                assert isinstance(e, OSError)
+        assert os.path.getsize(self.journal_path) > 0
+        self._crash()
+
+        assert recover(self.journal_path, self.snapshot_path) == 0
+        product = product_instances.get_by("id", self.product.id)
+        assert product.stock_qty == 7
+        assert stock_reservations.reserved_qty(product) == 2
+        assert order_instances.get_by("id", pending.id).order_total() == 200
+
+        journal = OrderJournal(self.journal_path, snapshot_path=self.snapshot_path)
+        journal.record("cancelled", pending, {})
+        journal.close()
+        assert replay(self.journal_path, after=6) == 1
+
+    def test_compact_without_snapshot_path(self):
+        journal = OrderJournal(self.journal_path)
+        try:
+            journal.compact()
+        except Exception as e:
+            assert isinstance(e, ValueError)
+        finally:
+            journal.close()
@@ -0,0 +1,65 @@
+import json
+import logging
+from unittest import TestCase
+
+from src.log import (
+    RateLimitFilter,
+    StructuredFormatter,
+    configure_logging,
+    shutdown_logging,
+)
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class TestLogging(TestCase):
+    def tearDown(self):
+        shutdown_logging()
+
+    def test_repeated_messages_are_rate_limited(self):
+        handler = RecordingHandler()
+        configure_logging(handler=handler, burst=2, interval=60)
+        logger = logging.getLogger("src.order")
+
+        for order_id in range(5):
+            logger.warning("Status repeated for %s", order_id, extra={"order_id": 1})
+        logger.warning("Another message")
+        shutdown_logging()
+
+        messages = [record.getMessage() for record in handler.records]
+        assert messages == [
+            "Status repeated for 0",
+            "Status repeated for 1",
+            "Another message",
+        ]
+        assert handler.records[0].order_id == 1
+
+    def test_suppressed_count_is_reported(self):
+        rate_limit = RateLimitFilter(burst=1, interval=0)
+        record = logging.LogRecord("src", logging.INFO, "", 0, "message", (), None)
+
+        assert rate_limit.filter(record)
+        rate_limit.interval = 60
+        assert not rate_limit.filter(record)
+        rate_limit.interval = 0
+        assert rate_limit.filter(record)
+        assert record.suppressed == 1
+
+    def test_structured_formatter(self):
+        record = logging.LogRecord(
+            "src.order", logging.WARNING, "", 0, "Order %s", ("x",), None
+        )
+        record.order_id = "x"
+
+        entry = json.loads(StructuredFormatter().format(record))
+
+        assert entry["message"] == "Order x"
+        assert entry["logger"] == "src.order"
+        assert entry["order_id"] == "x"
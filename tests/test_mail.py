@@ -0,0 +1,210 @@
+import smtplib
+import socketserver
+import threading
+from unittest import TestCase
+
+from src.exceptions import EmailDeliveryError
+from src.mail import MailOutbox, SMTPTransport, StubTransport, ssl_context
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Minimal stand-in SMTP server speaking just enough of the protocol"""
+
+    def reply(self, line: str) -> None:
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.reply("220 localhost")
+        while line := self.rfile.readline().decode().strip():
+            command = line.split(" ", 1)[0].upper()
+            if command == "EHLO":
+                self.reply("250-localhost")
+                self.reply("250 AUTH PLAIN")
+            elif command == "AUTH":
+                self.reply("235 Authenticated")
+            elif command == "RCPT":
+                recipient = line.split(":", 1)[1].strip("<> ")
+                if recipient.startswith("refused@"):
+                    self.reply("550 No such user")
+                    continue
+                self.server.recipients.append(recipient)
+                self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                while self.rfile.readline().decode().strip() != ".":
+                    pass
+                self.server.messages += 1
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
+
+
+class FailingTransport(StubTransport):
+    def __init__(self, failures: int):
+        super().__init__()
+        self.failures = failures
+
+    def send(self, message, recipients):
+        if self.failures:
+            self.failures -= 1
+            raise smtplib.SMTPServerDisconnected
+        super().send(message, recipients)
+
+
+class MalformedMessageTransport(StubTransport):
+    def send(self, message, recipients):
+        if message == "malformed":
+            raise ValueError(message)
+        super().send(message, recipients)
+
+
+class BlockingTransport(StubTransport):
+    def __init__(self):
+        super().__init__()
+        self.sending = threading.Event()
+        self.unblocked = threading.Event()
+
+    def send(self, message, recipients):
+        self.sending.set()
+        self.unblocked.wait(timeout=5)
+        super().send(message, recipients)
+
+
+class DisconnectedConnection:
+    def __init__(self):
+        self.closed = False
+
+    def sendmail(self, sender, recipients, message):
+        raise smtplib.SMTPServerDisconnected
+
+    def close(self):
+        self.closed = True
+
+
+class TestMailOutbox(TestCase):
+    def test_enqueue_delivers_messages(self):
+        transport = StubTransport()
+        outbox = MailOutbox(transport=transport)
+        outbox.enqueue("12345", "gvido@python.org")
+        outbox.enqueue("54321", ["guido@python.org", "van@python.org"])
+        outbox.flush(timeout=5)
+        outbox.close()
+
+        assert transport.sent == [
+            ("12345", ["gvido@python.org"]),
+            ("54321", ["guido@python.org", "van@python.org"]),
+        ]
+
+    def test_retry_with_backoff(self):
+        transport = FailingTransport(failures=2)
+        outbox = MailOutbox(transport=transport, retry_delay=0.01)
+        future = outbox.enqueue("12345", "gvido@python.org")
+
+        assert future.result(timeout=5) is True
+        assert transport.sent == [("12345", ["gvido@python.org"])]
+        outbox.close()
+
+    def test_give_up_after_max_retries(self):
+        outbox = MailOutbox(
+            transport=FailingTransport(failures=5), max_retries=2, retry_delay=0.01
+        )
+        future = outbox.enqueue("12345", "gvido@python.org")
+
+        assert isinstance(future.exception(timeout=5), smtplib.SMTPServerDisconnected)
+        outbox.close()
+
+    def test_malformed_message_fails_without_stopping_the_worker(self):
+        transport = MalformedMessageTransport()
+        outbox = MailOutbox(transport=transport, retry_delay=0.01)
+        malformed = outbox.enqueue("malformed", "gvido@python.org")
+
+        assert isinstance(malformed.exception(timeout=5), ValueError)
+        assert outbox.enqueue("12345", "gvido@python.org").result(timeout=5)
+        assert transport.sent == [("12345", ["gvido@python.org"])]
+        outbox.close()
+
+    def test_cancelled_message_is_not_sent(self):
+        transport = BlockingTransport()
+        outbox = MailOutbox(transport=transport)
+        outbox.enqueue("12345", "gvido@python.org")
+        transport.sending.wait(timeout=5)
+        cancelled = outbox.enqueue("54321", "guido@python.org")
+        assert cancelled.cancel()
+        transport.unblocked.set()
+
+        assert outbox.enqueue("67890", "van@python.org").result(timeout=5)
+        assert [message for message, _ in transport.sent] == ["12345", "67890"]
+        outbox.close()
+
+    def test_not_configured_server(self):
+        outbox = MailOutbox(transport=SMTPTransport(server=None))
+        future = outbox.enqueue("12345", "gvido@python.org")
+
+        assert isinstance(future.exception(timeout=5), EmailDeliveryError)
+        outbox.close()
+
+
+class TestSMTPTransport(TestCase):
+    def setUp(self):
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SMTPHandler)
+        self.server.connections = 0
+        self.server.messages = 0
+        self.server.recipients = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_connection_is_reused(self):
+        transport = SMTPTransport(
+            server="127.0.0.1",
+            port=self.server.server_address[1],
+            sender_email="sender@python.org",
+            password="secret",
+            use_ssl=False,
+        )
+        outbox = MailOutbox(transport=transport)
+        for i in range(10):
+            outbox.enqueue(f"code {i}", [f"user{i}@python.org"])
+        outbox.flush(timeout=5)
+        outbox.close()
+
+        assert self.server.messages == 10
+        assert self.server.connections == 1
+        assert self.server.recipients == [f"user{i}@python.org" for i in range(10)]
+
+    def test_refused_recipient_keeps_connection(self):
+        transport = SMTPTransport(
+            server="127.0.0.1",
+            port=self.server.server_address[1],
+            sender_email="sender@python.org",
+            use_ssl=False,
+        )
+        try:
+            transport.send("code", ["refused@python.org"])
+        except Exception as e:
+            assert isinstance(e, smtplib.SMTPRecipientsRefused)
+        transport.send("code", ["gvido@python.org"])
+        transport.close()
+
+        assert self.server.connections == 1
+        assert self.server.recipients == ["gvido@python.org"]
+
+    def test_disconnected_connection_is_closed(self):
+        transport = SMTPTransport(server="127.0.0.1", use_ssl=False)
+        connection = transport._connection = DisconnectedConnection()
+        try:
+            transport.send("code", ["gvido@python.org"])
+        except Exception as e:
+            assert isinstance(e, smtplib.SMTPServerDisconnected)
+
+        assert connection.closed
+        assert transport._connection is None
+
+    def test_ssl_context_is_shared(self):
+        assert ssl_context() is ssl_context()
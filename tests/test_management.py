@@ -0,0 +1,98 @@
+import threading
+from dataclasses import dataclass
+from unittest import TestCase
+
+from src.exceptions import ObjectAlreadyExists
+from src.management import InstanceManagement
+
+
+@dataclass
+class Record:
+    id: str
+    sku: str
+    group: str
+
+
+class TestInstanceManagement(TestCase):
+    def setUp(self):
+        self.management = InstanceManagement(
+            [], unique_indexes=("sku",), indexes=("group",)
+        )
+
+    def test_unique_index_lookup(self):
+        record = Record(id="1", sku="product-1", group="a")
+        self.management.set_instance(record)
+
+        assert self.management.exists("sku", "product-1")
+        assert self.management.get_by("sku", "product-1") is record
+        assert self.management.get_by("id", "1") is record
+        assert not self.management.exists("sku", "product-2")
+
+    def test_unique_index_rejects_duplicates(self):
+        self.management.set_instance(Record(id="1", sku="product-1", group="a"))
+        try:
+            self.management.set_instance(Record(id="2", sku="product-1", group="a"))
+        except Exception as e:
+            assert isinstance(e, ObjectAlreadyExists)
+
+        assert len(self.management.get_instances()) == 1
+
+    def test_non_unique_index_lookup(self):
+        first = Record(id="1", sku="product-1", group="a")
+        second = Record(id="2", sku="product-2", group="a")
+        third = Record(id="3", sku="product-3", group="b")
+        for record in (first, second, third):
+            self.management.set_instance(record)
+
+        assert self.management.filter_by("group", "a") == [first, second]
+        assert self.management.filter_by("group", "c") == []
+
+    def test_set_empty_instances_resets_indexes(self):
+        self.management.set_instance(Record(id="1", sku="product-1", group="a"))
+        self.management.set_empty_instances()
+
+        assert not self.management.exists("sku", "product-1")
+        assert not self.management.exists("group", "a")
+
+    def test_set_instances_is_all_or_nothing(self):
+        self.management.set_instance(Record(id="1", sku="product-1", group="a"))
+        try:
+            self.management.set_instances(
+                [
+                    Record(id="2", sku="product-2", group="a"),
+                    Record(id="3", sku="product-1", group="b"),
+                ]
+            )
+        except Exception as e:
+            assert isinstance(e, ObjectAlreadyExists)
+
+        assert len(self.management.get_instances()) == 1
+        self.management.set_instances([Record(id="2", sku="product-2", group="a")])
+        assert len(self.management.filter_by("group", "a")) == 2
+
+
+class TestConcurrentInstanceManagement(TestCase):
+    def test_concurrent_unique_inserts(self):
+        management = InstanceManagement([], unique_indexes=("sku",), concurrent=True)
+        barrier = threading.Barrier(8)
+        inserted = []
+
+        def insert(thread_id):
+            barrier.wait()
+            for i in range(200):
+                try:
+                    management.set_instance(
+                        Record(id=f"{thread_id}-{i}", sku=f"product-{i}", group="a")
+                    )
+                    inserted.append(i)
+                except ObjectAlreadyExists:
+                    pass
+
+        threads = [threading.Thread(target=insert, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(inserted) == list(range(200))
+        assert len(management.get_instances()) == 200
@@ -0,0 +1,88 @@
+from unittest import TestCase
+
+from src.helpers import deferred_registration
+from src.metrics import MetricsRegistry, metrics
+from src.exceptions import StatusDoesNotExists
+from src.order import Order
+from src.product import Product, product_instances
+
+
+class TestMetrics(TestCase):
+    def tearDown(self):
+        metrics.disable()
+        metrics.reset()
+        product_instances.set_empty_instances()
+
+    def test_disabled_metrics_are_not_collected(self):
+        Product("Metrics product", price=100, discount=0, stock_qty=1)
+        product_instances.get_by("sku", "metrics-product")
+
+        assert metrics.counters == {}
+        assert metrics.histograms == {}
+
+    def test_instrumented_hot_paths(self):
+        metrics.enable()
+        Product("Metrics product", price=100, discount=0, stock_qty=1)
+        product_instances.get_by("sku", "metrics-product")
+
+        assert (
+            metrics.counter_value(
+                "registry_lookups_total", registry="products", index="sku"
+            )
+            >= 1
+        )
+        lookups = metrics.histogram(
+            "registry_lookup_seconds", registry="products", index="sku"
+        )
+        assert lookups.count >= 1
+        registrations = metrics.histogram("model_registration_seconds", model="Product")
+        assert registrations.count == 1
+
+    def test_order_validation_is_timed(self):
+        metrics.enable()
+        try:
+            Order(
+                customer=None,
+                customer_address=None,
+                employee=None,
+                _order_delivery_status=13,
+            )
+        except Exception as e:
+            assert isinstance(e, StatusDoesNotExists)
+        registrations = metrics.histogram("model_registration_seconds", model="Order")
+        assert registrations.count == 1
+
+    def test_instrumented_order_total(self):
+        with deferred_registration():
+            order = Order(customer=None, customer_address=None, employee=None)
+        order.order_total()
+        assert metrics.histogram("order_total_seconds").count == 0
+
+        metrics.enable()
+        order.order_total()
+        assert metrics.histogram("order_total_seconds").count == 1
+
+    def test_percentiles_and_export(self):
+        registry = MetricsRegistry()
+        for value in range(1, 101):
+            registry.observe("latency_seconds", value, path="orders")
+        registry.increment("requests_total", 3, path="orders")
+
+        histogram = registry.histogram("latency_seconds", path="orders")
+        assert histogram.percentile(0.5) == 51
+        assert histogram.percentile(0.99) == 100
+
+        exported = registry.export()
+        assert "# TYPE requests_total counter" in exported
+        assert 'requests_total{path="orders"} 3' in exported
+        assert 'latency_seconds{path="orders",quantile="0.9"} 91' in exported
+        assert 'latency_seconds_count{path="orders"} 100' in exported
+
+    def test_export_escapes_and_skips_labels(self):
+        registry = MetricsRegistry()
+        registry.increment("lookups_total", index='a\\b"c\nd', registry=None)
+
+        assert registry.export() == (
+            "# TYPE lookups_total counter\n"
+            'lookups_total{index="a\\\\b\\"c\\nd"} 1\n'
+        )
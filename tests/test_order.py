@@ -15,6 +15,7 @@ from src.exceptions import (
     InvalidCustomerAddress,
     ItemsDoNotFound,
     OrderAlreadyHasBeenPaid,
+    OrderDoesNotExist,
     RateError,
 )
 from src.order import Order, OrderItem, order_instances
@@ -25,6 +26,8 @@ from src.customer import (
     customer_instances,
     customer_address_instances,
 )
+from src.stock import stock_reservations
+from src.transitions import delivery_state_machine
 from src.user import User, user_instances
 
 
@@ -45,6 +48,9 @@ class TestOrderItem(TestCase):
             price=45_000,
         )
 
+    def tearDown(self):
+        product_instances.set_empty_instances()
+
     def test_create_order_item_success(self):
         products = [self.product, self.product1]
 
@@ -527,3 +533,391 @@ class TestOrder(TestCase):
         order.add_item(item1)
 
         assert len(order.get_employee_orders(order.employee.id)) == 1
+
+    def test_get_customer_orders_page(self):
+        orders = [
+            Order(
+                self.customer,
+                customer_address=self.customer_address,
+                employee=self.employee,
+            )
+            for _ in range(5)
+        ]
+
+        assert order_instances.filter_by("customer.id", self.customer.id) == orders
+        assert Order.get_customer_orders_page(self.customer.id, 2, 2) == orders[2:4]
+        assert Order.get_employee_orders_page(self.employee.id, 3, 2) == orders[4:]
+        assert list(Order.iter_customer_orders(self.customer.id, 1)) == orders[1:]
+        assert list(Order.iter_employee_orders("unknown")) == []
+
+    def test_iter_customer_orders_while_creating_orders(self):
+        orders = [
+            Order(
+                self.customer,
+                customer_address=self.customer_address,
+                employee=self.employee,
+            )
+            for _ in range(3)
+        ]
+
+        iterated = []
+        for order in Order.iter_customer_orders(self.customer.id):
+            iterated.append(order)
+            Order(
+                self.customer,
+                customer_address=self.customer_address,
+                employee=self.employee,
+            )
+        assert iterated == orders
+        assert len(Order.get_customer_orders(self.customer.id)) == 6
+
+    def test_bulk_create_orders(self):
+        row = {
+            "customer": self.customer,
+            "customer_address": self.customer_address,
+            "employee": self.employee,
+        }
+        rows = [
+            row,
+            {**row, "customer_address": self.fail_customer_address},
+            {**row, "_order_delivery_status": 13},
+            row,
+        ]
+
+        result = Order.bulk_create(rows)
+
+        assert len(result.orders) == 2
+        assert isinstance(result.errors[1], InvalidCustomerAddress)
+        assert isinstance(result.errors[2], StatusDoesNotExists)
+        assert Order.get_customer_orders(self.customer.id) == result.orders
+
+    def test_cancel_order_releases_reserved_stock(self):
+        order = Order(
+            self.customer,
+            customer_address=self.customer_address,
+            employee=self.employee,
+        )
+        items = [
+            OrderItem(product=product, qty=10, item_price=product.final_price)
+            for product in (self.product, self.product1)
+        ]
+        order.add_items(items)
+        assert stock_reservations.available_qty(self.product) == 3
+
+        try:
+            order.add_item(
+                OrderItem(product=self.product, qty=5, item_price=45_000)
+            )
+        except Exception as e:
+            assert isinstance(e, StockQuantityIsNotEnough)
+
+        order.change_order_delivery_status(OrderDeliveryStatuses.CANCELED.value)
+        assert stock_reservations.available_qty(self.product) == 13
+        assert stock_reservations.available_qty(self.product1) == 15
+
+    def test_constructor_and_bulk_items_are_reserved(self):
+        row = {
+            "customer": self.customer,
+            "customer_address": self.customer_address,
+            "employee": self.employee,
+        }
+        order = Order(
+            **row, items=[OrderItem(product=self.product, qty=10, item_price=45_000)]
+        )
+        assert stock_reservations.reserved_qty(self.product) == 10
+
+        try:
+            Order(
+                **row, items=[OrderItem(product=self.product, qty=5, item_price=45_000)]
+            )
+        except Exception as e:
+            assert isinstance(e, StockQuantityIsNotEnough)
+        assert Order.get_customer_orders(self.customer.id) == [order]
+
+        items = [
+            OrderItem(product=self.product, qty=qty, item_price=45_000)
+            for qty in (3, 1)
+        ]
+        result = Order.bulk_create([{**row, "items": [item]} for item in items])
+
+        assert len(result.orders) == 1
+        assert isinstance(result.errors[1], StockQuantityIsNotEnough)
+        assert stock_reservations.available_qty(self.product) == 0
+
+    def test_delivered_order_consumes_reserved_stock(self):
+        order = Order(
+            self.customer,
+            customer_address=self.customer_address,
+            employee=self.employee,
+            items=[OrderItem(product=self.product, qty=3, item_price=45_000)],
+        )
+        try:
+            self.product.update_qty(11)
+        except Exception as e:
+            assert isinstance(e, StockQuantityIsNotEnough)
+        assert self.product.stock_qty == 13
+
+        order.change_order_payment_status(OrderPaymentStatus.PAID.value)
+        order.change_order_delivery_status(OrderDeliveryStatuses.DELIVERED.value)
+
+        assert self.product.stock_qty == 10
+        assert stock_reservations.reserved_qty(self.product) == 0
+        assert stock_reservations.order_reservation(order.id) == {}
+
+    def test_get_orders_by_status(self):
+        orders = [
+            Order(
+                self.customer,
+                customer_address=self.customer_address,
+                employee=self.employee,
+                items=[OrderItem(product=self.product, qty=1, item_price=45_000)],
+            )
+            for _ in range(4)
+        ]
+        paid, delivered, on_the_way, cancelled = orders
+        for order in (paid, delivered):
+            order.change_order_payment_status(OrderPaymentStatus.PAID.value)
+        delivered.change_order_delivery_status(OrderDeliveryStatuses.DELIVERED.value)
+        on_the_way.change_order_delivery_status(OrderDeliveryStatuses.ON_THE_WAY.value)
+        cancelled.change_order_payment_status(OrderPaymentStatus.CANCELED.value)
+
+        assert Order.get_orders_by_status(
+            delivery_status=OrderDeliveryStatuses.ON_THE_WAY.value
+        ) == [on_the_way]
+        assert Order.get_orders_by_status(
+            payment_status=OrderPaymentStatus.PAID.value,
+            exclude_delivery_status=OrderDeliveryStatuses.DELIVERED.value,
+        ) == [paid]
+        assert Order.get_orders_by_status(
+            delivery_status=OrderDeliveryStatuses.CANCELED.value,
+            payment_status=OrderPaymentStatus.CANCELED.value,
+        ) == [cancelled]
+        assert Order.get_orders_by_status(
+            delivery_status=OrderDeliveryStatuses.WAITING.value
+        ) == [paid]
+
+    def test_change_orders_delivery_status_with_hook(self):
+        orders = [
+            Order(
+                self.customer,
+                customer_address=self.customer_address,
+                employee=self.employee,
+                items=[OrderItem(product=self.product, qty=1, item_price=45_000)],
+            )
+            for _ in range(3)
+        ]
+        transitions = []
+
+        def hook(order, transition):
+            transitions.append((order, transition.source, transition.target))
+
+        delivery_state_machine.on_transition(
+            hook, target=OrderDeliveryStatuses.ON_THE_WAY
+        )
+        try:
+            Order.change_orders_delivery_status(
+                orders, OrderDeliveryStatuses.ON_THE_WAY.value
+            )
+        finally:
+            delivery_state_machine.remove_hook(hook)
+
+        waiting = OrderDeliveryStatuses.WAITING.value
+        on_the_way = OrderDeliveryStatuses.ON_THE_WAY.value
+        assert transitions == [(order, waiting, on_the_way) for order in orders]
+
+        orders[0].change_order_payment_status(OrderPaymentStatus.PAID.value)
+        try:
+            Order.change_orders_delivery_status(
+                orders, OrderDeliveryStatuses.PICK_UP.value
+            )
+        except Exception as e:
+            assert isinstance(e, OrderAlreadyHasBeenPaid)
+        assert all(order.delivery_status == on_the_way for order in orders)
+
+    def test_batch_change_delivery_status(self):
+        orders = [
+            Order(
+                self.customer,
+                customer_address=self.customer_address,
+                employee=self.employee,
+                items=[OrderItem(product=self.product, qty=1, item_price=45_000)],
+            )
+            for _ in range(3)
+        ]
+        empty = Order(
+            self.customer,
+            customer_address=self.customer_address,
+            employee=self.employee,
+        )
+        orders[0].change_order_payment_status(OrderPaymentStatus.PAID.value)
+        order_ids = [order.id for order in (*orders, empty)] + ["unknown"]
+        order_ids += [orders[2].id, orders[1].id]  # duplicates are applied once
+
+        result = Order.batch_change_delivery_status(
+            order_ids, OrderDeliveryStatuses.ON_THE_WAY.value
+        )
+
+        assert result.changed == [orders[1].id, orders[2].id]
+        assert isinstance(result.errors[orders[0].id], OrderAlreadyHasBeenPaid)
+        assert isinstance(result.errors[empty.id], ItemsDoNotFound)
+        assert isinstance(result.errors["unknown"], OrderDoesNotExist)
+        assert Order.get_orders_by_status(
+            delivery_status=OrderDeliveryStatuses.ON_THE_WAY.value
+        ) == orders[1:]
+
+    def test_batch_change_status_reports_failed_hooks(self):
+        orders = [
+            Order(
+                self.customer,
+                customer_address=self.customer_address,
+                employee=self.employee,
+                items=[OrderItem(product=self.product, qty=1, item_price=45_000)],
+            )
+            for _ in range(3)
+        ]
+
+        def hook(order, transition):
+            if order is orders[1]:
+                raise RuntimeError("hook failed")
+
+        delivery_state_machine.on_transition(
+            hook, target=OrderDeliveryStatuses.ON_THE_WAY
+        )
+        try:
+            result = Order.batch_change_delivery_status(
+                [order.id for order in orders], OrderDeliveryStatuses.ON_THE_WAY.value
+            )
+        finally:
+            delivery_state_machine.remove_hook(hook)
+
+        assert result.changed == [orders[0].id, orders[2].id]
+        assert isinstance(result.errors[orders[1].id], RuntimeError)
+
+    def test_order_total_is_kept_on_item_changes(self):
+        order = Order(
+            self.customer,
+            customer_address=self.customer_address,
+            employee=self.employee,
+        )
+        item = OrderItem(product=self.product, qty=2, item_price=100)
+        other = OrderItem(product=self.product1, qty=1, item_price=50)
+        order.add_items([item, other])
+        assert order.order_total() == 250
+
+        order.update_item_qty(item.id, 5)
+        assert order.order_total() == 550
+        assert stock_reservations.reserved_qty(self.product) == 5
+
+        other.item_price = 30
+        assert order.order_total() == 530
+
+        order.remove_item(item.id)
+        assert order.order_total() == 30
+        assert [i.id for i in order.items] == [other.id]
+        assert stock_reservations.reserved_qty(self.product) == 0
+
+    def test_order_total_does_not_drift(self):
+        order = Order(
+            self.customer,
+            customer_address=self.customer_address,
+            employee=self.employee,
+        )
+        items = [
+            OrderItem(product=self.product, qty=1, item_price=0.1) for _ in range(10)
+        ]
+        order.add_items(items)
+        assert order.order_total() == 1
+
+        for item in items[1:]:
+            order.remove_item(item.id)
+        assert order.order_total() == 0.1
+
+        order.remove_item(items[0].id)
+        assert order.order_total() == 0
+
+    def test_items_keep_list_interface(self):
+        first = OrderItem(product=self.product, qty=2, item_price=100)
+        order = Order(
+            self.customer,
+            customer_address=self.customer_address,
+            employee=self.employee,
+            items=[first],
+        )
+        second = OrderItem(product=self.product1, qty=1, item_price=50)
+        third = OrderItem(product=self.product1, qty=1, item_price=10)
+
+        order.items.append(second)
+        order.items.extend([third])
+        assert order.items == [first, second, third]
+        assert order.items[1:] == [second, third]
+        assert order.items[-1] is third
+        assert order.items.index(second) == 1
+        assert order.order_total() == 260
+
+        assert order.items.pop(0) is first
+        assert order.order_total() == 60
+        order.items.insert(0, first)
+        del order.items[1]
+        assert order.items == (first, third)
+        assert order.items.get(third.id) is third
+        assert order.order_total() == 210
+
+        order.items[1] = second
+        assert order.items == [first, second]
+        assert third._order_items is None
+        assert order.order_total() == 250
+
+    def test_add_items_merges_lines_of_same_price(self):
+        full_price = OrderItem(product=self.product, qty=1, item_price=100)
+        discounted = OrderItem(product=self.product, qty=1, item_price=90)
+        order = Order(
+            self.customer,
+            customer_address=self.customer_address,
+            employee=self.employee,
+            items=[full_price, discounted],
+        )
+
+        order.add_items(
+            [
+                OrderItem(product=self.product, qty=2, item_price=90),
+                OrderItem(product=self.product1, qty=1, item_price=50),
+                OrderItem(product=self.product1, qty=1, item_price=50),
+            ],
+            merge=True,
+        )
+
+        assert len(order.items) == 3
+        assert discounted.qty == 3 and full_price.qty == 1
+        assert order.items[2].product is self.product1
+        assert order.items[2].qty == 2
+        assert order.order_total() == 470
+        assert stock_reservations.reserved_qty(self.product) == 4
+        assert stock_reservations.reserved_qty(self.product1) == 2
+
+    def test_add_item_merges_same_product(self):
+        order = Order(
+            self.customer,
+            customer_address=self.customer_address,
+            employee=self.employee,
+        )
+        for _ in range(3):
+            order.add_item(
+                OrderItem(product=self.product, qty=4, item_price=100), merge=True
+            )
+        order.add_item(
+            OrderItem(product=self.product1, qty=1, item_price=100), merge=True
+        )
+
+        assert len(order.items) == 2
+        assert order.items[0].qty == 12
+        assert order.order_total() == 1300
+        assert stock_reservations.reserved_qty(self.product) == 12
+
+        try:
+            order.add_item(
+                OrderItem(product=self.product, qty=4, item_price=100), merge=True
+            )
+        except Exception as e:
+            assert isinstance(e, StockQuantityIsNotEnough)
+        assert order.items[0].qty == 12
+        assert order.order_total() == 1300
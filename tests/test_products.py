@@ -22,10 +22,21 @@ class TestProduct(TestCase):
     def test_create_product_fail(self):
         Product(**self.product_data)
         try:
-            Product(**self.product_data)
+            product_instances.set_instance(Product(**self.product_data))
         except Exception as e:
             assert isinstance(e, ObjectAlreadyExists)
 
+    def test_sku_collisions_are_suffixed(self):
+        products = [Product(**self.product_data) for _ in range(3)]
+        similar = Product(**{**self.product_data, "product_name": "Product: 1!"})
+
+        assert [product.sku for product in products] == [
+            "product-1",
+            "product-1-2",
+            "product-1-3",
+        ]
+        assert similar.sku == "product-1-4"
+
     def test_wrong_discount(self):
         data = self.product_data
         data["discount"] = -1
@@ -57,3 +68,33 @@ class TestProduct(TestCase):
     def test_make_sku_dynamically(self):
         product = Product(**self.product_data)
         assert product.sku == "product-1"
+
+    def test_final_price_invalidated_on_change(self):
+        data = {**self.product_data, "discount": 10}
+        product = Product(**data)
+        assert product.final_price == 270
+
+        product.price = 400
+        assert product.final_price == 360
+        product.discount = 50
+        assert product.final_price == 200
+
+        try:
+            product.discount = 101
+        except Exception as e:
+            assert isinstance(e, DiscountError)
+        assert product.final_price == 200
+
+    def test_reprice_products(self):
+        products = [
+            Product(product_name=f"Product {i}", price=i, discount=0, stock_qty=1)
+            for i in range(1, 5)
+        ]
+        Product.reprice(products, 50)
+
+        assert [product.discount for product in products] == [50] * 4
+        assert [product.final_price for product in products] == [0.5, 1, 1.5, 2]
+
+        product = products[0]
+        product.price = 10
+        assert product.final_price == 5
@@ -0,0 +1,71 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from src.customer import Customer, CustomerAddress, customer_instances
+from src.employee import Employee, EmployeeDepartment, employee_instances
+from src.order import Order, OrderItem, order_instances
+from src.product import Product, product_instances
+from src.snapshot import load_snapshot, save_snapshot
+from src.user import User, user_instances
+
+
+class TestSnapshot(TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".snapshot")
+        os.close(handle)
+
+    def tearDown(self):
+        os.remove(self.path)
+        for registry in (
+            order_instances,
+            product_instances,
+            customer_instances,
+            employee_instances,
+            user_instances,
+        ):
+            registry.set_empty_instances()
+
+    def test_save_and_restore_keeps_references(self):
+        address = CustomerAddress(address="Armenia, Yerevan")
+        customer = Customer(
+            user=User("Gvido", "Van Rosom", "+374747474", "gvido@snapshot.org"),
+            addresses=[address],
+        )
+        employee = Employee(
+            user=User("Gvido", "Van Rosom", "+374747474", "gvido@snapshot-staff.org"),
+            department=EmployeeDepartment("Snapshot delivery"),
+            salary=1000,
+            num_absent=0,
+            absense_cost=0,
+        )
+        product = Product("Snapshot product", price=100, discount=0, stock_qty=10)
+        order = Order(customer, customer_address=address, employee=employee)
+        order.add_item(OrderItem(product=product, qty=2, item_price=100))
+
+        save_snapshot(self.path)
+        order_instances.set_empty_instances()
+        product_instances.set_empty_instances()
+        customer_instances.set_empty_instances()
+
+        restored = load_snapshot(self.path)
+        assert restored["orders"] == 1
+
+        restored_order = order_instances.get_by("id", order.id)
+        assert restored_order is not order
+        assert restored_order.order_total() == 200
+        assert restored_order.customer is customer_instances.get_by("id", customer.id)
+        assert restored_order.items[0].product is product_instances.get_by(
+            "sku", "snapshot-product"
+        )
+        assert restored_order.customer_address is restored_order.customer.addresses[0]
+        assert Order.get_customer_orders(customer.id) == [restored_order]
+
+    def test_load_not_snapshot_file(self):
+        with open(self.path, "wb") as file:
+            file.write(b"not a snapshot")
+
+        try:
+            load_snapshot(self.path)
+        except Exception as e:
+            assert isinstance(e, ValueError)
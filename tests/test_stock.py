@@ -0,0 +1,89 @@
+import threading
+from unittest import TestCase
+
+from src.exceptions import StockQuantityIsNotEnough
+from src.product import Product, product_instances
+from src.stock import StockReservationEngine
+
+
+class TestStockReservationEngine(TestCase):
+    def setUp(self):
+        product_instances.set_empty_instances()
+        self.engine = StockReservationEngine()
+        self.product = Product(
+            product_name="Reserved product", price=100, discount=0, stock_qty=5
+        )
+        self.product1 = Product(
+            product_name="Reserved product 1", price=100, discount=0, stock_qty=5
+        )
+
+    def tearDown(self):
+        product_instances.set_empty_instances()
+
+    def test_reserve_all_or_nothing(self):
+        self.engine.reserve("order-1", [(self.product, 3)])
+        try:
+            self.engine.reserve("order-2", [(self.product1, 2), (self.product, 3)])
+        except Exception as e:
+            assert isinstance(e, StockQuantityIsNotEnough)
+
+        assert self.engine.available_qty(self.product) == 2
+        assert self.engine.available_qty(self.product1) == 5
+        assert self.engine.order_reservation("order-2") == {}
+
+    def test_release_order(self):
+        self.engine.reserve("order-1", [(self.product, 3), (self.product1, 1)])
+        self.engine.release("order-1", [(self.product, 1)])
+        assert self.engine.order_reservation("order-1") == {
+            self.product.id: 2,
+            self.product1.id: 1,
+        }
+
+        self.engine.release("order-1")
+        assert self.engine.available_qty(self.product) == 5
+        assert self.engine.available_qty(self.product1) == 5
+
+    def test_consume_order(self):
+        self.engine.reserve("order-1", [(self.product, 3), (self.product1, 1)])
+        self.engine.consume("order-1")
+
+        assert self.product.stock_qty == 2
+        assert self.product1.stock_qty == 4
+        assert self.engine.reserved_qty(self.product) == 0
+        assert self.engine.order_reservation("order-1") == {}
+
+    def test_consume_drops_reservation_under_product_lock(self):
+        self.engine.reserve("order-1", [(self.product, 3)])
+        with self.engine.lock_for(self.product):
+            consuming = threading.Thread(target=self.engine.consume, args=("order-1",))
+            consuming.start()
+            consuming.join(timeout=0.1)
+            assert self.engine.order_reservation("order-1") == {self.product.id: 3}
+            assert self.engine.reserved_qty(self.product) == 3
+        consuming.join()
+
+        assert self.engine.order_reservation("order-1") == {}
+        assert self.engine.reserved_qty(self.product) == 0
+        assert self.product.stock_qty == 2
+
+    def test_concurrent_reservations_do_not_oversell(self):
+        succeeded = []
+
+        def reserve(order_id):
+            try:
+                self.engine.reserve(order_id, [(self.product, 1), (self.product1, 1)])
+                succeeded.append(order_id)
+            except StockQuantityIsNotEnough:
+                pass
+
+        threads = [
+            threading.Thread(target=reserve, args=(f"order-{i}",)) for i in range(20)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(succeeded) == 5
+        assert self.engine.available_qty(self.product) == 0
+        assert self.engine.available_qty(self.product1) == 0
@@ -0,0 +1,110 @@
+import os
+import tempfile
+from dataclasses import dataclass
+from unittest import TestCase
+
+from src.exceptions import ObjectAlreadyExists
+from src.helpers import BaseModel
+from src.management import InstanceManagement
+from src.storage import SQLiteBackend
+
+parents = InstanceManagement([], unique_indexes=("name",), name="test_parents")
+children = InstanceManagement([], indexes=("parent.id", "age"), name="test_children")
+
+
+@dataclass
+class Parent(BaseModel):
+    name: str
+    __management_instance = parents
+
+
+@dataclass
+class Child(BaseModel):
+    parent: Parent
+    age: int
+    __management_instance = children
+
+
+class TestSQLiteBackend(TestCase):
+    def setUp(self):
+        handle, self.path = tempfile.mkstemp(suffix=".sqlite3")
+        os.close(handle)
+        self.backend = SQLiteBackend(self.path, batch_size=100)
+        parents.attach_backend(self.backend)
+        children.attach_backend(self.backend)
+
+    def tearDown(self):
+        parents.set_empty_instances()
+        children.set_empty_instances()
+        parents.backend = children.backend = None
+        self.backend.close()
+        os.remove(self.path)
+
+    def count(self, table: str) -> int:
+        return self.backend.connection.execute(
+            f"SELECT COUNT(*) FROM {table}"
+        ).fetchone()[0]
+
+    def test_write_behind_batching(self):
+        parent = Parent(name="Gvido")
+        for age in range(98):
+            Child(parent=parent, age=age)
+        assert self.count("test_children") == 0
+
+        Child(parent=parent, age=98)
+        assert self.count("test_parents") == 1
+        assert self.count("test_children") == 99
+
+    def test_lazy_rehydration_keeps_references(self):
+        parent = Parent(name="Gvido")
+        first, second = Child(parent=parent, age=1), Child(parent=parent, age=2)
+        first.age = 10
+        children.persist(first)
+        parents.evict()
+        children.evict()
+        assert children.get_instances() == []
+
+        loaded = children.filter_by("parent.id", parent.id)
+        assert [child.age for child in loaded] == [10, 2]
+        assert loaded[0].parent is loaded[1].parent
+        assert loaded[0].parent.name == "Gvido"
+        assert parents.get_by("name", "Gvido") is loaded[0].parent
+        assert children.get_by("id", second.id) is loaded[1]
+
+    def test_select_rehydrates_only_matching_instances(self):
+        gvido, guido = Parent(name="Gvido"), Parent(name="Guido")
+        first, _ = Child(parent=gvido, age=1), Child(parent=gvido, age=2)
+        Child(parent=guido, age=1)
+        parents.evict()
+        children.evict()
+
+        selected = children.select({"parent.id": gvido.id}, exclude={"age": 1})
+        assert [child.age for child in selected] == [2]
+        assert len(children.get_instances()) == 2
+        assert children.get_by("id", first.id).age == 1
+
+    def test_unique_keys_checked_in_storage(self):
+        Parent(name="Gvido")
+        parents.evict()
+
+        try:
+            Parent(name="Gvido")
+        except Exception as e:
+            assert isinstance(e, ObjectAlreadyExists)
+        assert parents.exists("name", "Gvido")
+
+    def test_registration_does_not_query_storage(self):
+        Parent(name="Gvido")
+        self.backend.flush()
+        parents.evict()
+        parents.attach_backend(self.backend)  # loads the stored unique keys
+
+        statements = []
+        self.backend.connection.set_trace_callback(statements.append)
+        Parent(name="Guido")
+        try:
+            Parent(name="Gvido")
+        except Exception as e:
+            assert isinstance(e, ObjectAlreadyExists)
+        self.backend.connection.set_trace_callback(None)
+        assert statements == []